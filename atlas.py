@@ -0,0 +1,64 @@
+# atlas.py
+"""Sprite atlas: tile and entity images packed into a single surface."""
+
+import pygame
+from constants import *
+
+class SpriteAtlas:
+    """
+    Packs same-sized sprites into one surface on a fixed-width grid.
+
+    Each sprite is stored under a key and drawn by blitting its source rect
+    out of ``surface``, so a whole frame can go to the screen in a single
+    ``Surface.blits`` call. Sprites are plain colored squares for now; any
+    image of ``tile_size`` pixels can be added in their place. The surface
+    grows by whole rows as sprites are added.
+    """
+    def __init__(self, tile_size=TILE_SIZE, columns=16):
+        self.tile_size = tile_size
+        self.columns = columns
+        self.surface = pygame.Surface((columns * tile_size, tile_size))
+        self.rects = {}
+
+    def add(self, key, image):
+        """
+        Store an image under a key, replacing any sprite already there.
+
+        Returns:
+            pygame.Rect: Source rect of the sprite in ``surface``.
+        """
+        rect = self.rects.get(key)
+        if rect is None:
+            index = len(self.rects)
+            row, column = divmod(index, self.columns)
+            if (row + 1) * self.tile_size > self.surface.get_height():
+                self._grow()
+            rect = pygame.Rect(column * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size)
+            self.rects[key] = rect
+        self.surface.blit(image, rect)
+        return rect
+
+    def add_color(self, key, color):
+        """Store a square of solid color under a key and return its source rect."""
+        rect = self.add(key, pygame.Surface((self.tile_size, self.tile_size)))
+        self.surface.fill(color, rect)
+        return rect
+
+    def get(self, key):
+        """Return the source rect for a key, or None if it has no sprite."""
+        return self.rects.get(key)
+
+    def entity_rect(self, entity):
+        """Return the source rect for an entity's sprite, adding a plain one on first use."""
+        key = (entity.char, entity.color)
+        rect = self.rects.get(key)
+        if rect is None:
+            rect = self.add_color(key, entity.color)
+        return rect
+
+    def _grow(self):
+        """Double the number of rows, keeping the sprites already packed."""
+        width, height = self.surface.get_size()
+        surface = pygame.Surface((width, height * 2))
+        surface.blit(self.surface, (0, 0))
+        self.surface = surface
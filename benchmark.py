@@ -0,0 +1,218 @@
+# benchmark.py
+"""
+Reproducible benchmarks for the game's hot paths.
+
+Usage:
+    python benchmark.py [--output results.json] [--compare baseline.json] [--replay FILE]
+
+Every case is seeded, so two runs on the same commit do the same work.
+A recorded replay can be added as a workload taken from real play.
+Results hold median and percentile timings per case and can be compared
+against a file saved from another commit.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from constants import *
+from game import Game
+from map import Map
+from profiler import Profiler
+from replay import load_replay, replay_game
+from utils import calculate_fov
+
+SEED = 12345
+MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+def percentile(sorted_samples, fraction):
+    """Return the sample at a fraction of the way through a sorted list."""
+    index = min(int(fraction * len(sorted_samples)), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+def summarize(samples):
+    """Reduce a list of nanosecond timings to summary statistics in microseconds."""
+    samples = sorted(s / 1000 for s in samples)
+    return {
+        "samples": len(samples),
+        "min_us": samples[0],
+        "median_us": percentile(samples, 0.5),
+        "p90_us": percentile(samples, 0.9),
+        "p99_us": percentile(samples, 0.99),
+        "mean_us": sum(samples) / len(samples),
+    }
+
+def time_calls(func, repeat, warmup=3):
+    """Call func warmup + repeat times and return the timed durations in ns."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+def scripted_moves(count, seed=SEED):
+    """Return a fixed pseudo-random sequence of player moves."""
+    rng = random.Random(seed)
+    return [rng.choice(MOVES) for _ in range(count)]
+
+def new_game(seed=SEED, width=MAP_WIDTH, height=MAP_HEIGHT, profiler=None):
+    """Create a headless game from a fixed seed."""
+    random.seed(seed)
+    return Game(headless=True, seed=seed, width=width, height=height, profiler=profiler)
+
+def bench_map_generate(width, height, repeat):
+    """Time building and generating a map of the given size."""
+    random.seed(SEED)
+    return time_calls(lambda: Map(width, height), repeat)
+
+def bench_fov(width, height, radius, repeat):
+    """Time FOV from a fixed set of floor tiles, bypassing any cache."""
+    random.seed(SEED)
+    game_map = Map(width, height)
+    ys, xs = np.nonzero(game_map.walkable)
+    rng = random.Random(SEED)
+    spots = [(int(xs[i]), int(ys[i])) for i in (rng.randrange(len(xs)) for _ in range(64))]
+    position = iter(spots * (repeat // len(spots) + 2))
+    return time_calls(lambda: calculate_fov(game_map, *next(position), radius), repeat)
+
+def bench_process_action(turns, width=MAP_WIDTH, height=MAP_HEIGHT, profiler=None):
+    """Time Game.process_action over a scripted move sequence."""
+    game = new_game(SEED, width, height, profiler)
+    samples = []
+    for dx, dy in scripted_moves(turns):
+        if game.state != STATE_PLAYING:
+            game = new_game(SEED + len(samples), width, height, profiler)
+        start = time.perf_counter_ns()
+        game.process_action(dx, dy)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+def bench_draw(turns, idle, width=MAP_WIDTH, height=MAP_HEIGHT):
+    """Time Game.draw onto an off-screen surface, after moves or while idle."""
+    pygame.font.init()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    game = new_game(SEED, width, height)
+    game.draw(screen)
+    samples = []
+    for dx, dy in scripted_moves(turns):
+        if not idle:
+            if game.state != STATE_PLAYING:
+                game = new_game(SEED + len(samples), width, height)
+            game.process_action(dx, dy)
+        start = time.perf_counter_ns()
+        game.draw(screen)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+def bench_replay(replay, repeat):
+    """Time playing a whole replay back, without checksum verification."""
+    return time_calls(lambda: replay_game(replay, verify=False), repeat, warmup=1)
+
+def run_all(scale=1, replay=None):
+    """Run every benchmark case and return {case name: statistics}."""
+    cases = {
+        "map_generate_50x30": lambda: bench_map_generate(50, 30, 200 * scale),
+        "map_generate_200x200": lambda: bench_map_generate(200, 200, 50 * scale),
+        "process_action_50x30": lambda: bench_process_action(2000 * scale),
+        "process_action_profiled_50x30": lambda: bench_process_action(2000 * scale, profiler=Profiler()),
+        "draw_turn_50x30": lambda: bench_draw(500 * scale, idle=False),
+        "draw_idle_50x30": lambda: bench_draw(500 * scale, idle=True),
+        "process_action_500x500": lambda: bench_process_action(2000 * scale, 500, 500),
+        "draw_turn_500x500": lambda: bench_draw(500 * scale, False, 500, 500),
+    }
+    for width, height in ((50, 30), (200, 200)):
+        for radius in (4, 8, 16):
+            cases[f"fov_r{radius}_{width}x{height}"] = (
+                lambda w=width, h=height, r=radius: bench_fov(w, h, r, 500 * scale))
+    if replay is not None:
+        cases[f"replay_{len(replay)}_inputs"] = lambda: bench_replay(replay, 5 * scale)
+    results = {}
+    for name, case in cases.items():
+        results[name] = summarize(case())
+        print(f"{name:30s} median {results[name]['median_us']:10.1f} us"
+              f"  p90 {results[name]['p90_us']:10.1f} us  p99 {results[name]['p99_us']:10.1f} us")
+    return results
+
+def metadata():
+    """Describe the environment the benchmarks ran in."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "commit": commit or None,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "seed": SEED,
+    }
+
+def compare(results, baseline, threshold):
+    """
+    Print median ratios against a baseline run.
+
+    Returns:
+        list: Names of cases slower than the baseline by more than threshold.
+    """
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:30s} (new)")
+            continue
+        ratio = stats["median_us"] / old["median_us"] if old["median_us"] else float('inf')
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:30s} {old['median_us']:10.1f} -> {stats['median_us']:10.1f} us  x{ratio:5.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results from another run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="median slowdown counted as a regression (default 0.10)")
+    parser.add_argument('--scale', type=int, default=1, help="multiply the sample counts")
+    parser.add_argument('--replay', help="also time playing back this replay file")
+    args = parser.parse_args(argv)
+
+    replay = None
+    if args.replay:
+        try:
+            replay = load_replay(args.replay)
+        except (OSError, ValueError) as e:
+            print(f"Could not load replay: {e}")
+            return 1
+    results = run_all(args.scale, replay)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
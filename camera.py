@@ -0,0 +1,64 @@
+# camera.py
+"""Scrolling viewport onto the map."""
+
+import pygame
+from constants import *
+
+class Camera:
+    """
+    A viewport of ``width`` x ``height`` tiles that follows a target.
+
+    ``x``/``y`` is the map tile shown in the top-left corner. The camera
+    stays put while the target is more than ``margin`` tiles inside the
+    view, and recenters on it once it gets closer to an edge, so the view
+    scrolls in occasional jumps rather than on every step. The camera is
+    clamped to the map, and maps smaller than the viewport stay anchored at
+    the top-left corner of the screen.
+    """
+    def __init__(self, width=VIEW_WIDTH, height=VIEW_HEIGHT, tile_size=TILE_SIZE, margin=SCROLL_MARGIN):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.margin = margin
+        self.x = 0
+        self.y = 0
+
+    def follow(self, target_x, target_y, map_width, map_height):
+        """
+        Recenter the view on a tile that is too close to its edge, keeping
+        the view inside the map.
+
+        Returns:
+            tuple: (dx, dy) the camera moved by, in tiles.
+        """
+        x = self._follow_axis(self.x, self.width, target_x, map_width)
+        y = self._follow_axis(self.y, self.height, target_y, map_height)
+        moved = (x - self.x, y - self.y)
+        self.x, self.y = x, y
+        return moved
+
+    def _follow_axis(self, start, size, target, map_size):
+        """Return the camera's new start on one axis."""
+        margin = min(self.margin, (size - 1) // 2)
+        if not start + margin <= target < start + size - margin:
+            start = target - size // 2
+        return min(max(start, 0), max(map_size - size, 0))
+
+    def contains(self, x, y):
+        """Check if a map tile is inside the view."""
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def tile_rect(self, x, y):
+        """Return the screen rectangle of a map tile."""
+        size = self.tile_size
+        return pygame.Rect((x - self.x) * size, (y - self.y) * size, size, size)
+
+    @property
+    def offset(self):
+        """Pixel position of map tile (0, 0) on screen."""
+        return -self.x * self.tile_size, -self.y * self.tile_size
+
+    @property
+    def rect(self):
+        """The viewed area in map tiles as (x, y, width, height)."""
+        return self.x, self.y, self.width, self.height
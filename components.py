@@ -0,0 +1,105 @@
+# components.py
+"""Struct-of-arrays storage for entity components and bulk systems over it."""
+
+import numpy as np
+
+# Entity kinds stored in the ``kind`` component; 0 marks a free slot.
+KIND_FREE = 0
+KIND_PLAYER = 1
+KIND_MONSTER = 2
+KIND_ITEM = 3
+
+# Component name -> dtype. Every entity has every component; kinds that do
+# not use one leave it at zero.
+COMPONENTS = {
+    'x': np.int32,
+    'y': np.int32,
+    'health': np.int32,
+    'max_health': np.int32,
+    'strength': np.int32,
+    'defense': np.int32,
+    'xp_value': np.int32,
+    'speed': np.int32,
+    'kind': np.uint8,
+}
+
+class EntityStore:
+    """
+    Parallel typed arrays holding the components of a group of entities.
+
+    Each entity owns a slot; component ``name`` of slot ``i`` lives in
+    ``store.<name>[i]``. Released slots are reused, and the arrays double in
+    size when full. ``entities[i]`` is the view object using slot ``i`` (or
+    None). Only ``size`` leading slots are ever in use, and free slots hold
+    zeros in every component (KIND_FREE in ``kind``).
+    """
+    def __init__(self, capacity=16):
+        for name, dtype in COMPONENTS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.capacity = capacity
+        self.size = 0
+        self.entities = []
+        self.free = []
+
+    def allocate(self, entity, kind):
+        """Give an entity a zeroed slot and return its index."""
+        if self.free:
+            slot = self.free.pop()
+            self.entities[slot] = entity
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+            self.entities.append(entity)
+        self.kind[slot] = kind
+        return slot
+
+    def release(self, slot):
+        """Free a slot for reuse, clearing its components."""
+        for name in COMPONENTS:
+            getattr(self, name)[slot] = 0
+        self.entities[slot] = None
+        self.free.append(slot)
+
+    def slots(self, kind):
+        """Return the indices of all slots holding entities of a kind."""
+        return np.flatnonzero(self.kind[:self.size] == kind)
+
+    def _grow(self):
+        """Double the capacity of every component array."""
+        self.capacity *= 2
+        for name in COMPONENTS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+def component(name):
+    """Return a property that reads and writes one component of an entity's slot."""
+    def get(self):
+        return int(getattr(self.store, name)[self.slot])
+
+    def set(self, value):
+        getattr(self.store, name)[self.slot] = value
+
+    return property(get, set, doc=f"The entity's {name} component.")
+
+def chebyshev_distance(store, slots, x, y):
+    """Return the king-move distance from (x, y) to each of the given slots."""
+    return np.maximum(np.abs(store.x[slots] - x), np.abs(store.y[slots] - y))
+
+def move_by(store, slots, dxs, dys):
+    """Move every given slot by its own (dx, dy)."""
+    store.x[slots] += dxs
+    store.y[slots] += dys
+
+def apply_damage(store, slots, amounts):
+    """
+    Subtract damage from the health of the given slots.
+
+    Returns:
+        numpy.ndarray: The slots whose health dropped to zero or below.
+    """
+    store.health[slots] -= amounts
+    return slots[store.health[slots] <= 0]
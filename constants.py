@@ -6,10 +6,25 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 MAP_SCREEN_HEIGHT = 500  # Reserve space for UI
 
+# Longest the event-driven main loop sleeps waiting for input (ms)
+IDLE_TIMEOUT_MS = 1000
+
 # Tile properties
 TILE_SIZE = 16
 MAP_WIDTH = 50
 MAP_HEIGHT = 30
+# Viewport size in tiles; maps may be larger and scroll
+VIEW_WIDTH = SCREEN_WIDTH // TILE_SIZE
+VIEW_HEIGHT = MAP_SCREEN_HEIGHT // TILE_SIZE
+# The camera recenters once the player is this close to the view's edge
+SCROLL_MARGIN = 8
+FOV_RADIUS = 8
+# Map generator used unless another is chosen (see generators.py)
+DEFAULT_GENERATOR = 'rooms'
+# Minimap area in tiles and its pixels per tile
+MINIMAP_WIDTH = 64
+MINIMAP_HEIGHT = 40
+MINIMAP_SCALE = 2
 
 # Colors for pixel art and UI
 COLOR_BLACK = (0, 0, 0)
@@ -34,6 +49,11 @@ ITEM_CHAR = '!'
 STAIRS_DOWN_CHAR = '>'
 STAIRS_UP_CHAR = '<'
 
+# Save file
+SAVE_FILE = 'savegame.dat'
+PROFILE_FILE = 'profile.jsonl'
+REPLAY_FILE = 'replay.dat'
+
 # Game states
 STATE_MENU = 'menu'
 STATE_CHARACTER_CREATION = 'character_creation'
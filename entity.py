@@ -3,21 +3,59 @@
 
 import pygame
 from constants import *
+from components import COMPONENTS, EntityStore, KIND_FREE, component
+
+# Store for entities created without one and for entities taken off a level
+# (such as picked-up items) when no other store is given.
+SHARED_STORE = EntityStore()
 
 class Entity:
-    """Base class for all game entities."""
-    def __init__(self, x, y, char, color):
+    """
+    Base class for all game entities.
+
+    Entities are thin views: numeric components such as the position live
+    in a slot of an EntityStore, shared with the other entities of a level,
+    and are read and written through properties. Without a ``store`` the
+    entity goes in SHARED_STORE.
+    """
+    __slots__ = ('store', 'slot', 'char', 'color')
+    kind = KIND_FREE
+    x = component('x')
+    y = component('y')
+
+    def __init__(self, x, y, char, color, store=None):
+        self.store = store if store is not None else SHARED_STORE
+        self.slot = self.store.allocate(self, self.kind)
         self.x = x
         self.y = y
         self.char = char
         self.color = color
 
+    def release(self):
+        """Free the entity's slot; the entity must not be used afterwards."""
+        self.store.release(self.slot)
+
+    def detach(self, store=None):
+        """Move the entity's components to another store, SHARED_STORE by default."""
+        values = {name: getattr(self.store, name)[self.slot] for name in COMPONENTS}
+        self.store.release(self.slot)
+        self.store = store if store is not None else SHARED_STORE
+        self.slot = self.store.allocate(self, self.kind)
+        for name, value in values.items():
+            getattr(self.store, name)[self.slot] = value
+
     def move(self, dx, dy):
         """Move the entity by dx, dy."""
         self.x += dx
         self.y += dy
 
-    def draw(self, screen):
-        """Draw the entity as a colored rectangle."""
-        rect = pygame.Rect(self.x * TILE_SIZE, self.y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    def draw(self, screen, offset=(0, 0)):
+        """
+        Draw the entity as a colored rectangle.
+
+        Args:
+            screen: Surface to draw on.
+            offset (tuple): Pixel position of map tile (0, 0) on the surface.
+        """
+        rect = pygame.Rect(self.x * TILE_SIZE + offset[0], self.y * TILE_SIZE + offset[1], TILE_SIZE, TILE_SIZE)
         pygame.draw.rect(screen, self.color, rect)
\ No newline at end of file
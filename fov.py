@@ -0,0 +1,249 @@
+# fov.py
+"""Iterative, table-driven shadowcasting field of view."""
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import numpy as np
+
+# Octant transforms (xx, xy, yx, yy): map_x = x + dx * xx + dy * xy,
+# map_y = y + dx * yx + dy * yy for the scan offsets (dx, dy).
+OCTANTS = ((1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1))
+
+class FovTable:
+    """
+    Precomputed scan data for one radius.
+
+    Offsets are flat indices into a (2 * radius + 1) square window centred on
+    the viewer. For row j (1-based) ``rows[octant][j - 1]`` lists the cells of
+    that row as (l_slope, r_slope, lit, index); ``neg_r``/``neg_l`` hold the
+    negated right and left slopes in ascending order so a row can be clipped
+    to a [start, end] slope interval with two bisections.
+    """
+    def __init__(self, radius):
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.center = radius * self.size + radius
+        self.rows = [[] for _ in OCTANTS]
+        self.neg_r = []
+        self.neg_l = []
+        radius_squared = radius * radius
+        for j in range(1, radius + 1):
+            dy = -j
+            self.neg_r.append([-(dx + 0.5) / (dy - 0.5) for dx in range(-j, 1)])
+            self.neg_l.append([-(dx - 0.5) / (dy + 0.5) for dx in range(-j, 1)])
+            for octant, (xx, xy, yx, yy) in enumerate(OCTANTS):
+                self.rows[octant].append([
+                    ((dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5), dx * dx + dy * dy <= radius_squared,
+                     (radius + dx * yx + dy * yy) * self.size + radius + dx * xx + dy * xy)
+                    for dx in range(-j, 1)
+                ])
+
+_tables = {}
+
+def get_table(radius):
+    """Return the cached FovTable for a radius, building it on first use."""
+    table = _tables.get(radius)
+    if table is None:
+        table = _tables[radius] = FovTable(radius)
+    return table
+
+def compute_fov(transparent, x, y, radius):
+    """
+    Calculate field of view using non-recursive shadowcasting.
+
+    Args:
+        transparent (numpy.ndarray): (height, width) bool mask of tiles that
+            let light through. Tiles outside the array block light.
+        x (int): X-coordinate of the viewer.
+        y (int): Y-coordinate of the viewer.
+        radius (int): Visibility radius.
+
+    Returns:
+        numpy.ndarray: (height, width) bool mask of tiles visible to the viewer.
+    """
+    return expand_window(transparent.shape, *compute_fov_window(transparent, x, y, radius))
+
+def expand_window(shape, window, left, top):
+    """Place a window of visibility into an otherwise empty mask of a given shape."""
+    visible = np.zeros(shape, dtype=bool)
+    height, width = window.shape
+    visible[top:top + height, left:left + width] = window
+    return visible
+
+def compute_fov_window(transparent, x, y, radius):
+    """
+    Calculate field of view within the square the radius can reach.
+
+    Args:
+        transparent (numpy.ndarray): (height, width) bool mask of tiles that
+            let light through. Tiles outside the array block light.
+        x (int): X-coordinate of the viewer.
+        y (int): Y-coordinate of the viewer.
+        radius (int): Visibility radius.
+
+    Returns:
+        tuple: (window, left, top) where window is a bool mask of the visible
+        tiles in the map area whose top-left tile is (left, top). Cost
+        depends only on the radius, not on the map size.
+    """
+    return shadowcast(transparent, x, y, radius)[:3]
+
+def shadowcast(transparent, x, y, radius):
+    """
+    Calculate field of view like compute_fov_window, counting cells scanned.
+
+    Returns:
+        tuple: (window, left, top, visited) where visited is the number of
+        cells the scan examined.
+    """
+    height, width = transparent.shape
+    table = get_table(radius)
+    size = table.size
+
+    # Copy the viewer's neighbourhood into a padded window as a flat list;
+    # scalar reads from a list are far cheaper than from an ndarray.
+    x0, y0 = x - radius, y - radius
+    left, top = max(x0, 0), max(y0, 0)
+    right, bottom = min(x0 + size, width), min(y0 + size, height)
+    window = np.zeros((size, size), dtype=bool)
+    window[top - y0:bottom - y0, left - x0:right - x0] = transparent[top:bottom, left:right]
+    trans = window.ravel().tolist()
+    lit = bytearray(size * size)
+    lit[table.center] = 1
+    visited = 1
+
+    for rows in table.rows:
+        stack = [(1, 1.0, 0.0)]
+        while stack:
+            row, start, end = stack.pop()
+            if start < end:
+                continue
+            new_start = start
+            for j in range(row, radius + 1):
+                # Cells in the row whose slopes fall inside [end, start].
+                lo = bisect_left(table.neg_r[j - 1], -start)
+                hi = bisect_right(table.neg_l[j - 1], -end)
+                visited += hi - lo
+                blocked = False
+                for l_slope, r_slope, in_radius, index in rows[j - 1][lo:hi]:
+                    if in_radius:
+                        lit[index] = 1
+                    if blocked:
+                        if not trans[index]:
+                            new_start = r_slope
+                            continue
+                        blocked = False
+                        start = new_start
+                    elif not trans[index] and j < radius:
+                        blocked = True
+                        stack.append((j + 1, start, l_slope))
+                        new_start = r_slope
+                if blocked:
+                    break
+
+    local = np.frombuffer(bytes(lit), dtype=np.uint8).reshape(size, size).view(bool)
+    return local[top - y0:bottom - y0, left - x0:right - x0], left, top, visited
+
+class Visibility:
+    """
+    The tiles a viewer can see, kept as the window around the viewer.
+
+    ``window`` is a bool mask of the map area whose top-left tile is
+    (``left``, ``top``); tiles outside it are not visible. Queries cost no
+    more than the window or the area asked about, never the whole map.
+    """
+    __slots__ = ('window', 'left', 'top')
+
+    def __init__(self, window, left, top):
+        self.window = window
+        self.left = left
+        self.top = top
+
+    @property
+    def rect(self):
+        """The window's map area as (x, y, width, height)."""
+        height, width = self.window.shape
+        return self.left, self.top, width, height
+
+    def is_visible(self, x, y):
+        """Check if a map tile is visible."""
+        height, width = self.window.shape
+        x -= self.left
+        y -= self.top
+        return 0 <= x < width and 0 <= y < height and bool(self.window[y, x])
+
+    def crop(self, left, top, right, bottom):
+        """Return the visibility of a map area as a new bool array."""
+        height, width = self.window.shape
+        region = np.zeros((bottom - top, right - left), dtype=bool)
+        x0, y0 = max(left, self.left), max(top, self.top)
+        x1, y1 = min(right, self.left + width), min(bottom, self.top + height)
+        if x0 < x1 and y0 < y1:
+            region[y0 - top:y1 - top, x0 - left:x1 - left] = \
+                self.window[y0 - self.top:y1 - self.top, x0 - self.left:x1 - self.left]
+        return region
+
+class FovCache:
+    """
+    LRU cache of visibility results keyed by (map version, x, y, radius).
+
+    Map.version changes whenever tiles change, so results for an outdated
+    layout are never returned; they simply age out of the cache. Only the
+    window around the viewer is cached, so memory does not grow with the
+    map size. ``get_window`` and ``get_visibility`` hand out the cached
+    window itself, which callers must not modify; ``get`` expands it into a
+    fresh full-size mask. ``cells_visited`` totals the cells scanned on misses.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.cells_visited = 0
+
+    def get(self, map_obj, x, y, radius):
+        """Return a full-size visibility mask for a viewer, computing it on a miss."""
+        return expand_window(map_obj.transparent.shape, *self.get_window(map_obj, x, y, radius))
+
+    def get_visibility(self, map_obj, x, y, radius):
+        """Return a viewer's Visibility, computing it on a miss."""
+        return Visibility(*self.get_window(map_obj, x, y, radius))
+
+    def get_window(self, map_obj, x, y, radius):
+        """Return a viewer's visibility as (window, left, top), computing it on a miss."""
+        key = (map_obj.version, x, y, radius)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            window, left, top, visited = shadowcast(map_obj.transparent, x, y, radius)
+            entry = self.entries[key] = (window, left, top)
+            self.cells_visited += visited
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """Drop all cached results and reset the statistics."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.cells_visited = 0
+
+    def stats(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+            dict: hits, misses, hit_rate and current size.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.entries),
+        }
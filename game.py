@@ -2,124 +2,347 @@
 """Main game logic."""
 
 import random
-import pygame
+import numpy as np
 
-
-from map import Map
 from player import Player
-from monster import Monster
-from item import create_health_potion, create_strength_boost
-from ui import HealthBar, MessageLog, InventoryScreen
-from utils import calculate_fov
+from levels import LevelGenerator, LevelStore
+from ui import MessageLog
+from fov import FovCache
 from constants import *
 from sound import SoundManager
+from renderer import GameView
+from spatial import SpatialIndex
+from pathfinding import FlowField, PathFinder
+from components import EntityStore, chebyshev_distance
+from monster import CHASE_RANGE
+from scheduler import Scheduler, ACTION_COST, action_delay
+from profiler import Profiler
+from lighting import Lighting, PLAYER_LIGHT, TORCH_LIGHT, ITEM_LIGHT
 
 class Game:
-    """Manages the game state and mechanics."""
-    def __init__(self):
+    """
+    Manages the game state and mechanics.
+
+    Rendering and audio are observers registered with ``attach``; Game only
+    emits events such as ``'move'``, ``'attack'`` and ``'turn'``, so a
+    headless game runs the full turn logic without a display or mixer. A
+    ``seed`` reproduces the dungeon, and together with the player's inputs
+    the whole game. Levels are ``width`` x ``height`` tiles laid out by the
+    generator named ``generator``; unless ``pregenerate`` is false (the
+    default when headless) the next levels are generated in the background.
+    A ``profiler`` or ``sound`` passed in is used instead of a new one. With
+    ``start`` false no level is entered, so a caller such as the save loader
+    can set up the state and call ``initialize_level`` itself.
+    """
+    def __init__(self, headless=False, seed=None, pregenerate=None, width=MAP_WIDTH, height=MAP_HEIGHT,
+                 profiler=None, generator=DEFAULT_GENERATOR, sound=None, start=True):
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.rng = random.Random(f"{self.seed}:combat")
         self.current_level = 1
-        self.map = Map(MAP_WIDTH, MAP_HEIGHT)
+        self.map = None
         self.player = None
         self.monsters = []
         self.items = []
-        self.visible_tiles = set()
+        self.entity_store = None
+        self.player_store = EntityStore()
+        self.monster_index = None
+        self.item_index = None
+        self.visible = None
         self.state = STATE_PLAYING
-        self.health_bar = HealthBar(10, MAP_SCREEN_HEIGHT + 10, 200, 20)
-        self.message_log = MessageLog(220, MAP_SCREEN_HEIGHT + 10, SCREEN_WIDTH - 230, SCREEN_HEIGHT - MAP_SCREEN_HEIGHT - 20)
-        self.inventory_screen = InventoryScreen(SCREEN_WIDTH // 4, SCREEN_HEIGHT // 4, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-        self.sound = SoundManager()
-        self.initialize_level()
-
-    def initialize_level(self):
-        """Set up the current dungeon level."""
-        self.map = Map(MAP_WIDTH, MAP_HEIGHT)
-        self.player = Player(self.map.rooms[0].x + 2, self.map.rooms[0].y + 2)
-        self.monsters = [Monster(room.x + random.randint(0, room.w - 1), room.y + random.randint(0, room.h - 1))
-                         for room in self.map.rooms[1:-1]]
-        self.items = [random.choice([create_health_potion, create_strength_boost])(room.x + 1, room.y + 1)
-                      for room in self.map.rooms[1:]]
+        self.time = 0
+        self.scheduler = Scheduler()
+        self.fov_cache = FovCache()
+        self.path_finder = PathFinder(avoid=(TILE_STAIRS_UP,))
+        self.lighting = Lighting()
+        # The right end of the UI strip is left for the minimap.
+        self.message_log = MessageLog(220, MAP_SCREEN_HEIGHT + 10, SCREEN_WIDTH - 240 - MINIMAP_WIDTH * MINIMAP_SCALE,
+                                      SCREEN_HEIGHT - MAP_SCREEN_HEIGHT - 20)
+        self.headless = headless
+        self.profiler = Profiler(enabled=False) if profiler is None else profiler
+        self.recording = None
+        self.observers = []
+        self.view = None
+        if pregenerate is None:
+            pregenerate = not headless
+        self.levels = LevelGenerator(self.seed, width, height, background=pregenerate, generator=generator)
+        self.level_store = LevelStore()
+        self.sound = None
+        if not headless:
+            self.sound = sound if sound is not None else SoundManager()
+            self.attach(self.sound)
+        if start:
+            self.initialize_level()
+
+    def attach(self, observer):
+        """Register an observer to be notified of game events."""
+        self.observers.append(observer)
+
+    def detach(self, observer):
+        """Stop notifying an observer."""
+        self.observers.remove(observer)
+
+    def emit(self, event):
+        """Notify every observer of an event."""
+        for observer in self.observers:
+            observer.notify(self, event)
+
+    def initialize_level(self, ascending=False, level=None):
+        """
+        Set up the current dungeon level.
+
+        ``level`` is used when given; otherwise a level visited before is
+        restored from the level store, or a new one is generated. The player
+        arrives at the level's start, or by its down stairs when
+        ``ascending``.
+        """
+        if level is None:
+            level = self.level_store.restore(self.current_level)
+        if level is None:
+            level = self.levels.take(self.current_level)
+        self.levels.prefetch([number for number in (self.current_level + 1, self.current_level - 1)
+                              if number not in self.level_store])
+        self.map = level.map
+        x, y = level.exit if ascending else level.start
+        if self.player is None:
+            self.player = Player(x, y, self.player_store)
+        else:
+            self.player.x, self.player.y = x, y
+        self.monsters = level.monsters
+        self.items = level.items
+        self.entity_store = level.store
+        self.monster_index = SpatialIndex(self.map.width, self.map.height, self.monsters)
+        self.item_index = SpatialIndex(self.map.width, self.map.height, self.items)
+        self.scheduler.clear()
+        self.lighting.clear()
+        for i, room in enumerate(self.map.rooms):
+            self.lighting.set(('torch', i), *room.center(), *TORCH_LIGHT)
+        for item in self.items:
+            self.lighting.set(item, item.x, item.y, *ITEM_LIGHT)
         self.update_fov()
 
+    def change_level(self, delta):
+        """Store the current level and move ``delta`` levels down (or up if negative)."""
+        self.level_store.save(self.current_level, self.map, self.monsters, self.items)
+        self.current_level += delta
+        self.initialize_level(ascending=delta < 0)
+
     def update_fov(self):
-        """Update the player's field of view."""
-        self.visible_tiles = calculate_fov(self.map, self.player.x, self.player.y, 8)
-        for x, y in self.visible_tiles:
-            self.map.explored[y][x] = True
+        """Update the player's field of view, ``visible``, a Visibility window around the player."""
+        profiler = self.profiler
+        with profiler.phase('fov'):
+            x, y = self.player.x, self.player.y
+            misses, cells = self.fov_cache.misses, self.fov_cache.cells_visited
+            visible = self.visible = self.fov_cache.get_visibility(self.map, x, y, FOV_RADIUS)
+            self.map.mark_explored(visible.window, visible.left, visible.top)
+            self.lighting.set(self.player, x, y, *PLAYER_LIGHT)
+        if profiler.enabled:
+            profiler.count('fov_cache_misses', self.fov_cache.misses - misses)
+            profiler.count('fov_cells', self.fov_cache.cells_visited - cells)
 
     def process_action(self, dx, dy):
-        """Process player movement or action."""
+        """Process player movement or action as one profiled turn."""
+        with self.profiler.phase('turn'):
+            self.act(dx, dy)
+        self.profiler.end_turn()
+        if self.recording is not None:
+            self.recording.record_action(self, dx, dy)
+
+    def act(self, dx, dy):
+        """Carry out a player move, attack, pickup or stair step."""
+        profiler = self.profiler
         new_x, new_y = self.player.x + dx, self.player.y + dy
         if not self.map.is_walkable(new_x, new_y):
             return
-        for monster in self.monsters[:]:
-            if monster.x == new_x and monster.y == new_y:
-                damage = self.player.attack(monster)
+        monster = self.monster_index.first_at(new_x, new_y)
+        if monster is not None:
+            with profiler.phase('combat'):
+                damage = self.player.attack(monster, self.rng)
                 self.message_log.add(f"You hit the {monster.name} for {damage} damage.")
-                self.sound.play('attack')
+                self.emit('attack')
                 if monster.health <= 0:
                     self.message_log.add(f"You killed the {monster.name}!")
                     self.player.gain_xp(monster.xp_value)
                     self.monsters.remove(monster)
-                return
-        for i, item in enumerate(self.items):
-            if item.x == new_x and item.y == new_y:
-                if self.player.add_item(item):
+                    self.monster_index.remove(monster)
+                    self.scheduler.remove(monster)
+                    monster.release()
+            return
+        item = self.item_index.first_at(new_x, new_y)
+        if item is not None:
+            with profiler.phase('pickup'):
+                picked_up = self.player.add_item(item)
+                if picked_up:
                     self.message_log.add(f"Picked up {item.name}.")
-                    self.items.pop(i)
-                    break
+                    self.emit('pickup')
+                    self.items.remove(item)
+                    self.item_index.remove(item)
+                    self.lighting.remove(item)
+                    item.detach(self.player_store)
                 else:
                     self.message_log.add("Inventory full!")
-                    return
+            if not picked_up:
+                return
         tile = self.map.tiles[new_y][new_x]
         if tile == TILE_STAIRS_DOWN:
-            self.current_level += 1
+            with profiler.phase('level'):
+                self.change_level(1)
             self.message_log.add(f"You descend to level {self.current_level}.")
-            self.initialize_level()
+            self.emit('level')
         elif tile == TILE_STAIRS_UP and self.current_level > 1:
-            self.current_level -= 1
+            with profiler.phase('level'):
+                self.change_level(-1)
             self.message_log.add(f"You ascend to level {self.current_level}.")
-            self.initialize_level()
+            self.emit('level')
         else:
             self.player.move(dx, dy)
-            self.sound.play('move')
+            self.emit('move')
         self.update_monsters()
         self.update_fov()
+        self.emit('turn')
+
+    def travel_to(self, goal):
+        """
+        Walk towards a tile along a shortest path, one turn per step.
+
+        Travel stops on arrival, when a monster is in view, when the way is
+        blocked or when the level changes. Paths avoid the up stairs.
+
+        Returns:
+            int: Number of turns taken.
+        """
+        level = self.current_level
+        turns = 0
+        while self.state == STATE_PLAYING and self.current_level == level and not self.visible_monsters():
+            position = (self.player.x, self.player.y)
+            if position == goal:
+                break
+            path = self.path_finder.find_path(self.map, position, goal)
+            if not path:
+                break
+            self.process_action(path[0][0] - position[0], path[0][1] - position[1])
+            turns += 1
+            if (self.player.x, self.player.y) == position:
+                break
+        return turns
+
+    def travel_to_stairs(self):
+        """
+        Travel to the nearest explored down stairs.
+
+        Returns:
+            int: Number of turns taken.
+        """
+        found = np.argwhere(self.map.explored & (self.map.tiles == TILE_STAIRS_DOWN))
+        if not len(found):
+            self.message_log.add("You have not found the stairs down.")
+            return 0
+        px, py = self.player.x, self.player.y
+        y, x = min(found.tolist(), key=lambda cell: max(abs(cell[1] - px), abs(cell[0] - py)))
+        return self.travel_to((x, y))
+
+    def visible_monsters(self):
+        """Return the monsters in the player's field of view."""
+        visible = self.visible
+        return self.monster_index.in_mask(visible.window, visible.left, visible.top)
+
+    def use_item(self, index):
+        """Use an item from the player's inventory."""
+        self.player.use_item(index)
+        self.emit('use_item')
+        if self.recording is not None:
+            self.recording.record_use_item(self, index)
 
     def update_monsters(self):
-        """Update all monsters."""
-        for monster in self.monsters[:]:
-            if (monster.x, monster.y) in self.visible_tiles:
-                monster.update(self.player, self.map)
-                if abs(monster.x - self.player.x) <= 1 and abs(monster.y - self.player.y) <= 1:
-                    damage = monster.attack(self.player)
-                    self.message_log.add(f"The {monster.name} hits you for {damage} damage.")
-                    self.sound.play('attack')
-                    if self.player.health <= 0:
-                        self.message_log.add("You have died!")
-                        self.state = "dead"
+        """
+        Advance the clock by one player action and let due monsters act.
+
+        Monsters in the player's field of view are woken into the scheduler;
+        a scheduled monster that is no longer visible when its turn comes goes
+        dormant again. Monsters due at the same time act together as a batch.
+        """
+        with self.profiler.phase('monsters'):
+            self.time += ACTION_COST
+            scheduler = self.scheduler
+            for monster in self.visible_monsters():
+                if monster not in scheduler:
+                    scheduler.schedule(monster, self.time)
+                    self.profiler.count('monsters_woken')
+            visible = self.visible
+            flow_field = None
+            while self.state != "dead":
+                time, batch = scheduler.pop_batch(self.time)
+                if not batch:
+                    break
+                monsters = sorted((monster for monster in batch if visible.is_visible(monster.x, monster.y)),
+                                  key=lambda monster: (monster.y, monster.x))
+                if not monsters:
+                    continue
+                self.profiler.count('monster_actions', len(monsters))
+                flow_field = self.act_monsters(monsters, flow_field)
+                for monster in monsters:
+                    scheduler.schedule(monster, time + action_delay(monster.speed))
+
+    def act_monsters(self, monsters, flow_field=None):
+        """
+        Let a batch of monsters take one action each.
+
+        Chasing works on the level's component arrays in bulk: every monster
+        within CHASE_RANGE (and not already adjacent) gets its step from a
+        shared flow field at once. Steps are then claimed one monster at a
+        time, nearest to the player first, against ``monster_index``; a
+        monster whose cell is already taken falls back to its best free
+        step, or waits. Finally the adjacent monsters attack in turn.
+
+        Returns:
+            FlowField: The flow field towards the player, if one was needed.
+        """
+        store = self.entity_store
+        px, py = self.player.x, self.player.y
+        slots = np.fromiter((monster.slot for monster in monsters), dtype=np.intp, count=len(monsters))
+        distance = chebyshev_distance(store, slots, px, py)
+        chasing = (distance <= CHASE_RANGE) & (distance > 1)
+        if chasing.any():
+            if flow_field is None:
+                flow_field = FlowField(self.map, px, py, 2 * FOV_RADIUS)
+            movers = slots[chasing]
+            xs, ys = store.x[movers].tolist(), store.y[movers].tolist()
+            dxs, dys = flow_field.next_steps(store.x[movers], store.y[movers])
+            index = self.monster_index
+            order = sorted(range(len(movers)), key=lambda i: flow_field.distance(xs[i], ys[i]))
+            for i, dx, dy in zip(order, dxs[order].tolist(), dys[order].tolist()):
+                x, y = xs[i], ys[i]
+                if not (dx or dy):
+                    continue
+                if index.first_at(x + dx, y + dy) is not None:
+                    step = flow_field.next_step(x, y, index)
+                    if step is None:
+                        continue
+                    dx, dy = step
+                monster = store.entities[movers[i]]
+                monster.move(dx, dy)
+                index.relocate(monster, x, y)
+            distance = chebyshev_distance(store, slots, px, py)
+        for i in np.flatnonzero(distance <= 1).tolist():
+            monster = monsters[i]
+            damage = monster.attack(self.player, self.rng)
+            self.message_log.add(f"The {monster.name} hits you for {damage} damage.")
+            self.emit('attack')
+            if self.player.health <= 0:
+                self.message_log.add("You have died!")
+                self.state = "dead"
+        return flow_field
 
     def draw(self, screen):
-        """Render the game state."""
-        for y in range(self.map.height):
-            for x in range(self.map.width):
-                if (x, y) in self.visible_tiles:
-                    tile = self.map.tiles[y][x]
-                    color = COLOR_GRAY if tile == TILE_FLOOR else COLOR_YELLOW if tile in (TILE_STAIRS_DOWN, TILE_STAIRS_UP) else COLOR_BLACK
-                elif self.map.explored[y][x]:
-                    tile = self.map.tiles[y][x]
-                    color = COLOR_DARK_GRAY if tile == TILE_FLOOR else COLOR_BLACK
-                else:
-                    color = COLOR_BLACK
-                rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                pygame.draw.rect(screen, color, rect)
-        for item in self.items:
-            if (item.x, item.y) in self.visible_tiles:
-                item.draw(screen)
-        for monster in self.monsters:
-            if (monster.x, monster.y) in self.visible_tiles:
-                monster.draw(screen)
-        self.player.draw(screen)
-        self.health_bar.draw(screen, self.player)
-        self.message_log.draw(screen)
-        if self.state == STATE_INVENTORY:
-            self.inventory_screen.draw(screen, self.player)
\ No newline at end of file
+        """
+        Render the game state, attaching a GameView on first use.
+
+        Returns:
+            list: pygame.Rect areas of the screen that changed.
+        """
+        if self.view is None:
+            self.view = GameView()
+            self.attach(self.view)
+        with self.profiler.phase('draw'):
+            dirty = self.view.draw(self, screen)
+        self.profiler.end_frame()
+        return dirty
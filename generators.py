@@ -0,0 +1,206 @@
+# generators.py
+"""
+Pluggable dungeon generators.
+
+A generator is an object with a ``generate(game_map)`` method that fills a
+blank (all wall) Map: it carves floor into ``tiles``, sets ``rooms`` and
+places the stairs. Every level needs rooms, since stairs, the player's
+start and the spawns are placed in them; generators without real rooms
+carve small ones into their open areas. Carving writes ``tiles`` with
+array slicing; Map refreshes the masks and its version once ``generate``
+returns.
+"""
+
+import numpy as np
+from map import Room
+from constants import *
+
+ROOM_SIZE = 4
+
+def numpy_rng(rng):
+    """Derive a NumPy generator from a random.Random stream (or the random module)."""
+    return np.random.default_rng(rng.getrandbits(64))
+
+def neighbour_count(mask):
+    """
+    Count, for every cell, how many of its 8 neighbours are set.
+
+    Cells beyond the edge count as set, so the count is a 3x3 convolution
+    of the mask with a padded border of walls.
+    """
+    height, width = mask.shape
+    padded = np.pad(mask.astype(np.uint8), 1, constant_values=1)
+    total = np.zeros((height, width), dtype=np.uint8)
+    for dy in range(3):
+        for dx in range(3):
+            if dx != 1 or dy != 1:
+                total += padded[dy:dy + height, dx:dx + width]
+    return total
+
+def carve_corridor(tiles, rng, x1, y1, x2, y2):
+    """Carve an L-shaped corridor between two points, bending at random."""
+    if rng.random() < 0.5:
+        tiles[y1, min(x1, x2):max(x1, x2) + 1] = TILE_FLOOR
+        tiles[min(y1, y2):max(y1, y2) + 1, x2] = TILE_FLOOR
+    else:
+        tiles[min(y1, y2):max(y1, y2) + 1, x1] = TILE_FLOOR
+        tiles[y2, min(x1, x2):max(x1, x2) + 1] = TILE_FLOOR
+
+def serpentine_order(rooms, band=16):
+    """Sort rooms in horizontal bands of alternating direction, so neighbours in the list are close."""
+    def key(room):
+        row = room.y // band
+        return row, room.x if row % 2 == 0 else -room.x
+    return sorted(rooms, key=key)
+
+def anchor_rooms(tiles, rng, count):
+    """
+    Carve ``count`` small rooms whose top-left corners are random floor tiles.
+
+    Returns:
+        list: The rooms, in serpentine order.
+    """
+    height, width = tiles.shape
+    inner = tiles[1:height - ROOM_SIZE, 1:width - ROOM_SIZE] == TILE_FLOOR
+    candidates = np.flatnonzero(inner)
+    if len(candidates) == 0:
+        candidates = np.arange(inner.size)
+    picks = numpy_rng(rng).choice(candidates, size=min(count, len(candidates)), replace=False)
+    rooms = []
+    for index in picks.tolist():
+        y, x = divmod(index, inner.shape[1])
+        room = Room(x + 1, y + 1, ROOM_SIZE, ROOM_SIZE)
+        tiles[room.y:room.y + room.h, room.x:room.x + room.w] = TILE_FLOOR
+        rooms.append(room)
+    return serpentine_order(rooms)
+
+def room_count(game_map, area_per_room=150):
+    """Return how many anchor rooms to carve for the size of a map."""
+    return max(4, (game_map.width - 2) * (game_map.height - 2) // area_per_room)
+
+def finish(game_map, rooms):
+    """Set a generated map's rooms and place the stairs."""
+    game_map.rooms = rooms
+    game_map.place_stairs()
+
+class RoomsGenerator:
+    """Random non-overlapping rooms joined in order by corridors (Map.generate)."""
+    def generate(self, game_map):
+        game_map.generate()
+
+class BSPGenerator:
+    """
+    Binary space partitioning: split the map into leaves no smaller than
+    ``min_leaf``, put a room in each and join the two halves of every split
+    with a corridor.
+    """
+    def __init__(self, min_leaf=10):
+        self.min_leaf = min_leaf
+
+    def generate(self, game_map):
+        tiles, rng = game_map.tiles, game_map.rng
+        rooms = self.split(tiles, rng, 1, 1, game_map.width - 2, game_map.height - 2)
+        finish(game_map, rooms)
+
+    def split(self, tiles, rng, x, y, w, h):
+        """Partition an area and return its rooms, carving them and their corridors."""
+        min_leaf = self.min_leaf
+        vertical = w >= 2 * min_leaf and (h < 2 * min_leaf or w > h or (w == h and rng.random() < 0.5))
+        if vertical:
+            cut = rng.randint(min_leaf, w - min_leaf)
+            first = self.split(tiles, rng, x, y, cut, h)
+            second = self.split(tiles, rng, x + cut, y, w - cut, h)
+        elif h >= 2 * min_leaf:
+            cut = rng.randint(min_leaf, h - min_leaf)
+            first = self.split(tiles, rng, x, y, w, cut)
+            second = self.split(tiles, rng, x, y + cut, w, h - cut)
+        else:
+            room_w = rng.randint(min(ROOM_SIZE, w - 1), max(ROOM_SIZE, w - 2))
+            room_h = rng.randint(min(ROOM_SIZE, h - 1), max(ROOM_SIZE, h - 2))
+            room = Room(x + rng.randint(0, w - room_w), y + rng.randint(0, h - room_h), room_w, room_h)
+            tiles[room.y:room.y + room.h, room.x:room.x + room.w] = TILE_FLOOR
+            return [room]
+        carve_corridor(tiles, rng, *first[-1].center(), *second[0].center())
+        return first + second
+
+class CaveGenerator:
+    """
+    Cellular-automata caves: random noise smoothed by ``steps`` rounds of
+    the rule "wall if at least ``birth`` neighbours are walls, or if already
+    a wall with at least ``survive``". Anchor rooms are carved into the caves
+    and joined in order by corridors, so every room is reachable.
+    """
+    def __init__(self, fill=0.45, steps=4, birth=5, survive=4):
+        self.fill = fill
+        self.steps = steps
+        self.birth = birth
+        self.survive = survive
+
+    def generate(self, game_map):
+        tiles, rng = game_map.tiles, game_map.rng
+        wall = numpy_rng(rng).random(tiles.shape) < self.fill
+        for _ in range(self.steps):
+            neighbours = neighbour_count(wall)
+            wall = np.where(wall, neighbours >= self.survive, neighbours >= self.birth)
+        tiles[1:-1, 1:-1] = np.where(wall[1:-1, 1:-1], TILE_WALL, TILE_FLOOR)
+        rooms = anchor_rooms(tiles, rng, room_count(game_map))
+        for first, second in zip(rooms, rooms[1:]):
+            carve_corridor(tiles, rng, *first.center(), *second.center())
+        finish(game_map, rooms)
+
+class DrunkardGenerator:
+    """
+    Drunkard's walk: one walker per ``area_per_walker`` tiles sets off from
+    the centre and wanders until ``floor_fraction`` of the map is floor.
+    Walks advance ``steps`` moves at a time, computed for all walkers at
+    once with cumulative sums; every walk is a single path from the centre,
+    so the floor is connected by construction.
+    """
+    DX = np.array([1, -1, 0, 0], dtype=np.int32)
+    DY = np.array([0, 0, 1, -1], dtype=np.int32)
+
+    def __init__(self, floor_fraction=0.4, area_per_walker=2000, steps=200):
+        self.floor_fraction = floor_fraction
+        self.area_per_walker = area_per_walker
+        self.steps = steps
+
+    def generate(self, game_map):
+        tiles, rng = game_map.tiles, game_map.rng
+        nrng = numpy_rng(rng)
+        width, height = game_map.width, game_map.height
+        area = (width - 2) * (height - 2)
+        walkers = max(8, area // self.area_per_walker)
+        floor = np.zeros(width * height, dtype=bool)
+        xs = np.full(walkers, width // 2)
+        ys = np.full(walkers, height // 2)
+        carved = 0
+        while carved < self.floor_fraction * area:
+            moves = nrng.integers(0, 4, (walkers, self.steps), dtype=np.int8)
+            # Clamping a walk's running sum keeps every step a single move.
+            path_xs = np.clip(xs[:, None] + np.cumsum(self.DX[moves], axis=1), 1, width - 2)
+            path_ys = np.clip(ys[:, None] + np.cumsum(self.DY[moves], axis=1), 1, height - 2)
+            floor[path_ys * width + path_xs] = True
+            carved = np.count_nonzero(floor)
+            xs, ys = path_xs[:, -1], path_ys[:, -1]
+        tiles[floor.reshape(height, width)] = TILE_FLOOR
+        finish(game_map, anchor_rooms(tiles, rng, room_count(game_map)))
+
+# Generators by name, as chosen with Game(generator=...) and recorded in saves and replays.
+GENERATORS = {
+    'rooms': RoomsGenerator,
+    'bsp': BSPGenerator,
+    'caves': CaveGenerator,
+    'drunkard': DrunkardGenerator,
+}
+
+def get_generator(name):
+    """
+    Return a generator instance by name.
+
+    Raises:
+        ValueError: If there is no generator of that name.
+    """
+    try:
+        return GENERATORS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown generator {name!r}") from None
@@ -2,23 +2,37 @@
 """Item implementation."""
 
 from entity import Entity
+from components import KIND_ITEM
 from constants import *
 
 class Item(Entity):
     """A collectible item with an effect."""
-    def __init__(self, x, y, name, color, effect):
-        super().__init__(x, y, ITEM_CHAR, color)
+    __slots__ = ('name', 'effect')
+    kind = KIND_ITEM
+
+    def __init__(self, x, y, name, color, effect, store=None):
+        super().__init__(x, y, ITEM_CHAR, color, store)
         self.name = name
         self.effect = effect
 
-def create_health_potion(x, y):
+def create_health_potion(x, y, store=None):
     """Create a health potion item."""
     def heal(player):
         player.health = min(player.health + 20, player.max_health)
-    return Item(x, y, "Health Potion", COLOR_GREEN, heal)
+    return Item(x, y, "Health Potion", COLOR_GREEN, heal, store)
 
-def create_strength_boost(x, y):
+def create_strength_boost(x, y, store=None):
     """Create a strength-boosting item."""
     def boost(player):
         player.strength += 5
-    return Item(x, y, "Strength Elixir", COLOR_YELLOW, boost)
\ No newline at end of file
+    return Item(x, y, "Strength Elixir", COLOR_YELLOW, boost, store)
+
+# Item factories by item name, for rebuilding items from stored records.
+ITEM_TYPES = {
+    "Health Potion": create_health_potion,
+    "Strength Elixir": create_strength_boost,
+}
+
+def create_item(name, x, y, store=None):
+    """Create an item of a known type by its name."""
+    return ITEM_TYPES[name](x, y, store)
@@ -0,0 +1,304 @@
+# levels.py
+"""Dungeon levels: seeded generation, background pre-generation and storage."""
+
+import os
+import random
+import struct
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from map import Map
+from generators import get_generator
+from monster import Monster
+from item import create_health_potion, create_strength_boost, create_item
+from components import EntityStore
+from constants import *
+
+class Level:
+    """
+    A dungeon level ready to play: its map, and the monsters and items on it,
+    whose components live in the level's EntityStore.
+    """
+    def __init__(self, number, game_map, monsters, items, store):
+        self.number = number
+        self.map = game_map
+        self.monsters = monsters
+        self.items = items
+        self.store = store
+
+    @property
+    def start(self):
+        """Return the player's starting position on this level."""
+        room = self.map.rooms[0]
+        return room.x + 2, room.y + 2
+
+    @property
+    def exit(self):
+        """Return where the player arrives when coming back up to this level."""
+        room = self.map.rooms[-1]
+        return room.x + 2, room.y + 2
+
+def level_rng(seed, number):
+    """Return the random stream for one level of a seeded run."""
+    return random.Random(f"{seed}:{number}")
+
+def generate_level(seed, number, width=MAP_WIDTH, height=MAP_HEIGHT, generator=DEFAULT_GENERATOR):
+    """
+    Generate a level deterministically.
+
+    Args:
+        seed (int): Seed of the whole run.
+        number (int): Dungeon level number.
+        width (int): Map width.
+        height (int): Map height.
+        generator (str): Name of the map generator (see generators.py).
+
+    Returns:
+        Level: The same layout and spawns for the same (seed, number, generator).
+    """
+    rng = level_rng(seed, number)
+    game_map = Map(width, height, rng, generator=get_generator(generator))
+    store = EntityStore()
+    monsters = [Monster(room.x + rng.randint(0, room.w - 1), room.y + rng.randint(0, room.h - 1), store=store)
+                for room in game_map.rooms[1:-1]]
+    items = [rng.choice([create_health_potion, create_strength_boost])(room.x + 1, room.y + 1, store)
+             for room in game_map.rooms[1:]]
+    return Level(number, game_map, monsters, items, store)
+
+class LevelGenerator:
+    """
+    Hands out levels of a seeded run, optionally generating ahead of time.
+
+    With ``background`` set, ``prefetch`` queues levels on a worker thread so
+    ``take`` can return them without generating on the spot. Without it,
+    ``take`` simply generates the level synchronously.
+    """
+    def __init__(self, seed, width=MAP_WIDTH, height=MAP_HEIGHT, background=True, generator=DEFAULT_GENERATOR):
+        get_generator(generator)
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.generator = generator
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='levelgen') if background else None
+
+    def prefetch(self, numbers):
+        """Start generating the given levels and drop any others queued."""
+        if self.executor is None:
+            return
+        for number in list(self.pending):
+            if number not in numbers:
+                self.pending.pop(number).cancel()
+        for number in numbers:
+            if number >= 1 and number not in self.pending:
+                self.pending[number] = self.executor.submit(
+                    generate_level, self.seed, number, self.width, self.height, self.generator)
+
+    def take(self, number):
+        """Return level ``number``, waiting for it if it is still being generated."""
+        future = self.pending.pop(number, None)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return generate_level(self.seed, number, self.width, self.height, self.generator)
+
+    def shutdown(self):
+        """Stop the worker thread, abandoning queued levels."""
+        if self.executor is not None:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            self.executor.shutdown(wait=False)
+
+# Binary layout of a LevelSnapshot: a header, then length-prefixed sections.
+SNAPSHOT_MAGIC = b'LVL2'
+SNAPSHOT_HEADER = struct.Struct('<4sIHH')
+SECTION_LENGTH = struct.Struct('<I')
+MONSTER_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2'), ('health', '<i4'), ('strength', '<i4'),
+                          ('defense', '<i4'), ('xp_value', '<i4'), ('speed', '<i4')])
+POSITION_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2')])
+ROOM_DTYPE = np.dtype([('x', '<i2'), ('y', '<i2'), ('w', '<i2'), ('h', '<i2')])
+
+class LevelSnapshot:
+    """
+    Compact, immutable record of a visited level.
+
+    Tiles are raw bytes, the explored grid is a packed bitset and entities
+    are fixed-size records, with names kept in a separate text block.
+    """
+    def __init__(self, number, width, height, tiles, explored, rooms, monsters, monster_names,
+                 items, item_names):
+        self.number = number
+        self.width = width
+        self.height = height
+        self.tiles = tiles
+        self.explored = explored
+        self.rooms = rooms
+        self.monsters = monsters
+        self.monster_names = monster_names
+        self.items = items
+        self.item_names = item_names
+
+    @classmethod
+    def capture(cls, number, game_map, monsters, items):
+        """Snapshot a level's map and entities."""
+        rooms = np.array([(r.x, r.y, r.w, r.h) for r in game_map.rooms], dtype=ROOM_DTYPE)
+        monster_records = np.array([(m.x, m.y, m.health, m.strength, m.defense, m.xp_value, m.speed)
+                                    for m in monsters], dtype=MONSTER_DTYPE)
+        item_records = np.array([(i.x, i.y) for i in items], dtype=POSITION_DTYPE)
+        return cls(number, game_map.width, game_map.height, game_map.tiles.tobytes(),
+                   np.packbits(game_map.explored).tobytes(), rooms.tobytes(), monster_records.tobytes(),
+                   '\n'.join(m.name for m in monsters), item_records.tobytes(),
+                   '\n'.join(i.name for i in items))
+
+    def restore(self):
+        """
+        Rebuild the level.
+
+        Returns:
+            Level: Fresh map, monster and item objects.
+        """
+        shape = (self.height, self.width)
+        tiles = np.frombuffer(self.tiles, dtype=np.uint8).reshape(shape)
+        explored = np.unpackbits(np.frombuffer(self.explored, dtype=np.uint8),
+                                 count=self.width * self.height).reshape(shape).view(bool)
+        rooms = np.frombuffer(self.rooms, dtype=ROOM_DTYPE).tolist()
+        game_map = Map.from_tiles(tiles, explored, rooms)
+        store = EntityStore()
+        monsters = []
+        names = self.monster_names.split('\n')
+        for name, (x, y, health, strength, defense, xp_value, speed) in zip(
+                names, np.frombuffer(self.monsters, dtype=MONSTER_DTYPE).tolist()):
+            monster = Monster(x, y, name, health, strength, defense, store, speed)
+            monster.xp_value = xp_value
+            monsters.append(monster)
+        names = self.item_names.split('\n')
+        items = [create_item(name, x, y, store)
+                 for name, (x, y) in zip(names, np.frombuffer(self.items, dtype=POSITION_DTYPE).tolist())]
+        return Level(self.number, game_map, monsters, items, store)
+
+    def to_bytes(self):
+        """Serialize the snapshot."""
+        sections = (self.tiles, self.explored, self.rooms, self.monsters,
+                    self.monster_names.encode('utf-8'), self.items, self.item_names.encode('utf-8'))
+        parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.number, self.width, self.height)]
+        for section in sections:
+            parts.append(SECTION_LENGTH.pack(len(section)))
+            parts.append(section)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserialize a snapshot written by to_bytes."""
+        magic, number, width, height = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a level snapshot")
+        offset = SNAPSHOT_HEADER.size
+        sections = []
+        for _ in range(7):
+            (length,) = SECTION_LENGTH.unpack_from(data, offset)
+            offset += SECTION_LENGTH.size
+            sections.append(bytes(data[offset:offset + length]))
+            offset += length
+        tiles, explored, rooms, monsters, monster_names, items, item_names = sections
+        return cls(number, width, height, tiles, explored, rooms, monsters, monster_names.decode('utf-8'),
+                   items, item_names.decode('utf-8'))
+
+def read_source(source):
+    """Return the serialized snapshot from a LevelStore source: a LevelSnapshot or a spill file."""
+    if isinstance(source, LevelSnapshot):
+        return source.to_bytes()
+    with open(source, 'rb') as f:
+        return f.read()
+
+class LevelStore:
+    """
+    Keeps snapshots of visited levels.
+
+    The ``capacity`` most recently used snapshots stay in memory; older ones
+    are written to ``directory`` (a temporary directory by default) and read
+    back on demand, so memory stays bounded on deep runs.
+    """
+    def __init__(self, capacity=8, directory=None):
+        self.capacity = capacity
+        self.snapshots = OrderedDict()
+        self.directory = directory
+        self._tempdir = None
+        self.spilled = set()
+
+    def __contains__(self, number):
+        return number in self.snapshots or number in self.spilled
+
+    def save(self, number, game_map, monsters, items):
+        """Snapshot a level, evicting the least recently used one to disk if full."""
+        self.put(LevelSnapshot.capture(number, game_map, monsters, items))
+
+    def put(self, snapshot):
+        """Store an existing snapshot."""
+        self.snapshots[snapshot.number] = snapshot
+        self.snapshots.move_to_end(snapshot.number)
+        self.spilled.discard(snapshot.number)
+        while len(self.snapshots) > self.capacity:
+            _, oldest = self.snapshots.popitem(last=False)
+            self._spill(oldest)
+
+    def get(self, number):
+        """Return the snapshot of a level, or None if it was never stored."""
+        snapshot = self.snapshots.get(number)
+        if snapshot is not None:
+            self.snapshots.move_to_end(number)
+            return snapshot
+        if number in self.spilled:
+            with open(self._path(number), 'rb') as f:
+                snapshot = LevelSnapshot.from_bytes(f.read())
+            self.put(snapshot)
+            return snapshot
+        return None
+
+    def restore(self, number):
+        """Rebuild a stored level, or return None if it was never stored."""
+        snapshot = self.get(number)
+        return snapshot.restore() if snapshot is not None else None
+
+    def encoded(self):
+        """
+        Return (number, serialized snapshot) for every stored level.
+
+        Spilled levels are read straight from their files without being
+        loaded back into memory.
+        """
+        return [(number, read_source(source)) for number, source in self.sources()]
+
+    def sources(self):
+        """
+        Return (number, source) for every stored level, reading nothing.
+
+        A source is the in-memory LevelSnapshot or the path of the spilled
+        level's file; ``read_source`` turns it into serialized bytes, and may
+        do so on another thread, since snapshots never change and spill files
+        are replaced atomically.
+        """
+        return [(number, self.snapshots[number] if number in self.snapshots else self._path(number))
+                for number in sorted(set(self.snapshots) | self.spilled)]
+
+    def clear(self):
+        """Forget every stored level."""
+        for number in self.spilled:
+            os.remove(self._path(number))
+        self.spilled.clear()
+        self.snapshots.clear()
+
+    def _spill(self, snapshot):
+        """Write a snapshot to disk."""
+        if self.directory is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix='levels-')
+            self.directory = self._tempdir.name
+        path = self._path(snapshot.number)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(snapshot.to_bytes())
+        os.replace(path + '.tmp', path)
+        self.spilled.add(snapshot.number)
+
+    def _path(self, number):
+        """Return the file a spilled level is kept in."""
+        return os.path.join(self.directory, f"level_{number}.bin")
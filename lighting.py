@@ -0,0 +1,110 @@
+# lighting.py
+"""Dynamic light sources combined into a per-tile light level."""
+
+import numpy as np
+from fov import compute_fov_window, FovCache
+from constants import *
+
+# Light levels are integers, LIGHT_SCALE meaning full brightness; integer
+# sums stay exact however often fields are added and taken away.
+LIGHT_SCALE = 256
+
+# Light carried by the player, placed in every room, and given off by items.
+PLAYER_LIGHT = (FOV_RADIUS, 1.0)
+TORCH_LIGHT = (4, 0.6)
+ITEM_LIGHT = (2, 0.4)
+
+_falloffs = {}
+
+def get_falloff(radius):
+    """Return the (2r+1, 2r+1) brightness falloff around a light of a radius."""
+    falloff = _falloffs.get(radius)
+    if falloff is None:
+        offsets = np.arange(-radius, radius + 1)
+        distance = np.hypot(offsets[:, None], offsets[None, :])
+        falloff = _falloffs[radius] = np.clip(1 - distance / (radius + 1), 0, 1)
+    return falloff
+
+def light_field(game_map, x, y, radius, intensity, fov_cache=None):
+    """
+    Compute the light one source casts on a map.
+
+    Returns:
+        tuple: (field, left, top) where field is an int32 array of light
+        levels for the map area whose top-left tile is (left, top).
+    """
+    if fov_cache is not None:
+        window, left, top = fov_cache.get_window(game_map, x, y, radius)
+    else:
+        window, left, top = compute_fov_window(game_map.transparent, x, y, radius)
+    height, width = window.shape
+    falloff = get_falloff(radius)[top - y + radius:top - y + radius + height,
+                                  left - x + radius:left - x + radius + width]
+    field = np.where(window, np.rint(falloff * (intensity * LIGHT_SCALE)), 0).astype(np.int32)
+    return field, left, top
+
+class Lighting:
+    """
+    Light sources of a level and the light level they combine into.
+
+    Sources are registered under any hashable owner with ``set`` and dropped
+    with ``remove``. Each source's field is cached; ``update`` recomputes
+    only the sources that were added, moved or changed since the last call,
+    subtracting their old field from ``levels`` and adding the new one, and
+    rebuilds everything when the map's layout changes. Visibility windows
+    come from ``fov_cache``, a cache of the lighting's own by default, so
+    light sources never evict the entries of a viewer's cache.
+    """
+    def __init__(self, fov_cache=None):
+        self.fov_cache = FovCache() if fov_cache is None else fov_cache
+        self.sources = {}
+        self.fields = {}
+        self.dirty = set()
+        self.map = None
+        self.map_version = None
+        self.levels = None
+
+    def set(self, owner, x, y, radius, intensity):
+        """Add or update the light source of an owner."""
+        source = (x, y, radius, intensity)
+        if self.sources.get(owner) != source:
+            self.sources[owner] = source
+            self.dirty.add(owner)
+
+    def remove(self, owner):
+        """Remove the light source of an owner, if it has one."""
+        if self.sources.pop(owner, None) is not None:
+            self.dirty.add(owner)
+
+    def clear(self):
+        """Remove every light source."""
+        self.sources.clear()
+        self.fields.clear()
+        self.dirty.clear()
+        self.map = None
+
+    def update(self, game_map):
+        """
+        Bring the light levels up to date with the sources and a map.
+
+        Returns:
+            numpy.ndarray: (height, width) int32 light levels.
+        """
+        if game_map is not self.map or game_map.version != self.map_version:
+            self.map = game_map
+            self.map_version = game_map.version
+            self.levels = np.zeros((game_map.height, game_map.width), dtype=np.int32)
+            self.fields.clear()
+            self.dirty = set(self.sources)
+        levels = self.levels
+        for owner in self.dirty:
+            old = self.fields.pop(owner, None)
+            if old is not None:
+                field, left, top = old
+                levels[top:top + field.shape[0], left:left + field.shape[1]] -= field
+            source = self.sources.get(owner)
+            if source is not None:
+                field, left, top = self.fields[owner] = light_field(game_map, *source, self.fov_cache)
+                levels[top:top + field.shape[0], left:left + field.shape[1]] += field
+        self.dirty.clear()
+        return levels
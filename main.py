@@ -1,21 +1,60 @@
 # main.py
-"""Main entry point for the roguelike game."""
+"""
+Main entry point for the roguelike game.
 
+By default the loop sleeps in pygame.event.wait until input arrives and only
+updates the screen areas the game reports as changed. Pass --continuous to
+poll and redraw at a fixed 60 FPS instead, --profile to time every
+turn and frame and write the records to PROFILE_FILE on exit, and --record
+to save the session's inputs to REPLAY_FILE on exit (up to any F9 load).
+--generator NAME picks the map generator (one of generators.GENERATORS);
+saves and replays remember it.
+"""
+
+import sys
 import pygame
 from game import Game
+from generators import GENERATORS
+from profiler import Profiler
+from replay import record, save_replay
+from savegame import save_game, load_game
 from constants import *
 
+generator = sys.argv[sys.argv.index('--generator') + 1] if '--generator' in sys.argv[:-1] else DEFAULT_GENERATOR
+if generator not in GENERATORS:
+    sys.exit(f"Unknown generator {generator!r}; choose from {', '.join(sorted(GENERATORS))}")
+
 pygame.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Roguelike Adventure")
 clock = pygame.time.Clock()
-game = Game()
+# Posted by the save writer thread once the file is written (or failed).
+SAVE_FINISHED = pygame.event.custom_type()
+profiler = Profiler() if '--profile' in sys.argv else None
+game = Game(profiler=profiler, generator=generator)
+recording = record(game, checksum_interval=100) if '--record' in sys.argv else None
+event_driven = '--continuous' not in sys.argv
+
+def report_save(error):
+    """Hand a background save's outcome to the main loop."""
+    pygame.event.post(pygame.event.Event(SAVE_FINISHED, error=error))
 
 running = True
 while running:
-    for event in pygame.event.get():
+    if event_driven:
+        events = [pygame.event.wait(IDLE_TIMEOUT_MS)] + pygame.event.get()
+    else:
+        events = pygame.event.get()
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == SAVE_FINISHED:
+            if event.error is None:
+                game.message_log.add("Game saved.")
+            else:
+                game.message_log.add(f"Could not save game: {event.error}")
+        elif event.type == pygame.WINDOWEXPOSED and game.view is not None:
+            game.view.invalidate()
         elif event.type == pygame.KEYDOWN:
             if game.state == STATE_PLAYING:
                 if event.key == pygame.K_UP:
@@ -28,16 +67,37 @@ while running:
                     game.process_action(1, 0)
                 elif event.key == pygame.K_i:
                     game.state = STATE_INVENTORY
+                elif event.key == pygame.K_t:
+                    game.travel_to_stairs()
+                elif event.key == pygame.K_m and game.view is not None:
+                    game.view.toggle_minimap()
+                elif event.key == pygame.K_F5:
+                    save_game(game, on_done=report_save)
+                elif event.key == pygame.K_F9:
+                    try:
+                        loaded = load_game(sound=game.sound)
+                    except (OSError, ValueError) as e:
+                        game.message_log.add(f"Could not load game: {e}")
+                    else:
+                        game.levels.shutdown()
+                        loaded.profiler = game.profiler
+                        game = loaded
+                        game.message_log.add("Game loaded.")
             elif game.state == STATE_INVENTORY:
                 if event.key == pygame.K_ESCAPE:
                     game.state = STATE_PLAYING
                 elif event.key in (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
                                   pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9, pygame.K_0):
                     index = int(event.key - pygame.K_1)
-                    game.player.use_item(index)
-    screen.fill(COLOR_BLACK)
-    game.draw(screen)
-    pygame.display.flip()
-    clock.tick(60)
+                    game.use_item(index)
+    dirty = game.draw(screen)
+    if dirty:
+        pygame.display.update(dirty)
+    if not event_driven:
+        clock.tick(60)
 
+if profiler is not None:
+    profiler.export(PROFILE_FILE)
+if recording is not None:
+    save_replay(recording)
 pygame.quit()
\ No newline at end of file
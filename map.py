@@ -1,9 +1,34 @@
 # map.py
 """Map generation and management."""
 
+import itertools
 import random
+import numpy as np
 from constants import *
 
+# Source of Map.version values; unique across all maps so that caches keyed
+# by version never confuse two different maps.
+_versions = itertools.count(1)
+
+# Properties of every tile type as (walkable, transparent).
+TILE_PROPERTIES = {
+    TILE_FLOOR: (True, True),
+    TILE_WALL: (False, False),
+    TILE_STAIRS_DOWN: (True, True),
+    TILE_STAIRS_UP: (True, True),
+}
+
+def _tile_table(column):
+    """Build a lookup table indexed by tile id from one column of TILE_PROPERTIES."""
+    table = np.zeros(max(TILE_PROPERTIES) + 1, dtype=bool)
+    for tile, properties in TILE_PROPERTIES.items():
+        table[tile] = properties[column]
+    return table
+
+# Per-tile-type property lookup tables, indexed by tile id.
+WALKABLE_TILES = _tile_table(0)
+TRANSPARENT_TILES = _tile_table(1)
+
 class Room:
     """Represents a rectangular room in the dungeon."""
     def __init__(self, x, y, w, h):
@@ -22,23 +47,75 @@ class Room:
         return self.x + self.w // 2, self.y + self.h // 2
 
 class Map:
-    """Manages the dungeon map with tiles and properties."""
-    def __init__(self, width, height):
+    """
+    Manages the dungeon map with tiles and properties.
+
+    Grids are NumPy arrays indexed as [y, x] (so ``tiles[y][x]`` still works):
+    ``tiles`` holds uint8 tile ids, ``explored`` is a bool grid, and
+    ``walkable``/``transparent`` are bool masks derived from ``tiles``.
+    Change tiles through ``set_tile``/``fill_rect`` (or call ``update_masks``
+    after writing ``tiles`` directly) so the masks stay in sync. Each of
+    those calls also assigns a fresh ``version``, which caches derived from
+    the tiles use as part of their keys. ``explored_version`` counts the
+    calls to ``mark_explored`` that revealed new tiles, and
+    ``explored_bounds`` holds the (left, top, right, bottom) area of the
+    latest one.
+
+    Generation draws from ``rng`` (a random.Random) when one is given, and
+    from the global ``random`` module otherwise. It uses ``generator`` (see
+    generators.py) when one is given, and ``generate`` otherwise; the masks
+    and version are refreshed once the generator is done, whatever it wrote.
+    """
+    def __init__(self, width, height, rng=None, generate=True, generator=None):
         self.width = width
         self.height = height
-        self.tiles = [[TILE_WALL for _ in range(width)] for _ in range(height)]
-        self.explored = [[False for _ in range(width)] for _ in range(height)]
+        self.tiles = np.full((height, width), TILE_WALL, dtype=np.uint8)
+        self.explored = np.zeros((height, width), dtype=bool)
+        self.explored_version = 0
+        self.explored_bounds = None
+        self.walkable = np.zeros((height, width), dtype=bool)
+        self.transparent = np.zeros((height, width), dtype=bool)
         self.rooms = []
-        self.generate()
+        self.rng = rng if rng is not None else random
+        self.version = next(_versions)
+        if generate:
+            if generator is not None:
+                generator.generate(self)
+                # Generators may write ``tiles`` directly.
+                self.update_masks()
+            else:
+                self.generate()
+
+    @classmethod
+    def from_tiles(cls, tiles, explored=None, rooms=()):
+        """
+        Build a map from existing grids instead of generating one.
+
+        Args:
+            tiles (numpy.ndarray): (height, width) grid of tile ids.
+            explored (numpy.ndarray): Optional (height, width) bool grid.
+            rooms: Iterable of (x, y, w, h) room rectangles.
+
+        Returns:
+            Map: A map owning copies of the grids.
+        """
+        height, width = tiles.shape
+        game_map = cls(width, height, generate=False)
+        game_map.tiles = np.array(tiles, dtype=np.uint8)
+        if explored is not None:
+            game_map.explored = np.array(explored, dtype=bool)
+        game_map.rooms = [Room(*room) for room in rooms]
+        game_map.update_masks()
+        return game_map
 
     def generate(self):
         """Generate a dungeon with rooms and corridors."""
-        num_rooms = random.randint(8, 15)
+        num_rooms = self.rng.randint(8, 15)
         for _ in range(num_rooms):
-            w = random.randint(5, 10)
-            h = random.randint(5, 10)
-            x = random.randint(1, self.width - w - 1)
-            y = random.randint(1, self.height - h - 1)
+            w = self.rng.randint(5, 10)
+            h = self.rng.randint(5, 10)
+            x = self.rng.randint(1, self.width - w - 1)
+            y = self.rng.randint(1, self.height - h - 1)
             new_room = Room(x, y, w, h)
             if not any(new_room.overlaps(room) for room in self.rooms):
                 self.carve_room(new_room)
@@ -51,13 +128,11 @@ class Map:
 
     def carve_room(self, room):
         """Carve out a room in the map."""
-        for y in range(room.y, room.y + room.h):
-            for x in range(room.x, room.x + room.w):
-                self.tiles[y][x] = TILE_FLOOR
+        self.fill_rect(room.x, room.y, room.w, room.h, TILE_FLOOR)
 
     def create_corridor(self, x1, y1, x2, y2):
         """Create a corridor between two points."""
-        if random.random() < 0.5:
+        if self.rng.random() < 0.5:
             self.carve_h_corridor(x1, x2, y1)
             self.carve_v_corridor(y1, y2, x2)
         else:
@@ -66,25 +141,97 @@ class Map:
 
     def carve_h_corridor(self, x1, x2, y):
         """Carve a horizontal corridor."""
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            self.tiles[y][x] = TILE_FLOOR
+        self.fill_rect(min(x1, x2), y, abs(x2 - x1) + 1, 1, TILE_FLOOR)
 
     def carve_v_corridor(self, y1, y2, x):
         """Carve a vertical corridor."""
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            self.tiles[y][x] = TILE_FLOOR
+        self.fill_rect(x, min(y1, y2), 1, abs(y2 - y1) + 1, TILE_FLOOR)
 
     def place_stairs(self):
         """Place stairs up and down in the first and last rooms."""
-        self.tiles[self.rooms[0].y + 1][self.rooms[0].x + 1] = TILE_STAIRS_UP
-        self.tiles[self.rooms[-1].y + 1][self.rooms[-1].x + 1] = TILE_STAIRS_DOWN
+        self.set_tile(self.rooms[0].x + 1, self.rooms[0].y + 1, TILE_STAIRS_UP)
+        self.set_tile(self.rooms[-1].x + 1, self.rooms[-1].y + 1, TILE_STAIRS_DOWN)
+
+    def set_tile(self, x, y, tile):
+        """Set a single tile and refresh its walkable/transparent flags."""
+        self.tiles[y, x] = tile
+        self.walkable[y, x] = WALKABLE_TILES[tile]
+        self.transparent[y, x] = TRANSPARENT_TILES[tile]
+        self.version = next(_versions)
+
+    def fill_rect(self, x, y, w, h, tile):
+        """Set every tile in a rectangle to the same type."""
+        self.tiles[y:y + h, x:x + w] = tile
+        self.walkable[y:y + h, x:x + w] = WALKABLE_TILES[tile]
+        self.transparent[y:y + h, x:x + w] = TRANSPARENT_TILES[tile]
+        self.version = next(_versions)
+
+    def update_masks(self):
+        """Recompute the walkable/transparent masks from the whole tile grid."""
+        self.walkable = WALKABLE_TILES[self.tiles]
+        self.transparent = TRANSPARENT_TILES[self.tiles]
+        self.version = next(_versions)
+
+    def in_bounds(self, x, y):
+        """Check if a coordinate lies inside the map."""
+        return 0 <= x < self.width and 0 <= y < self.height
 
     def is_walkable(self, x, y):
         """Check if a tile is walkable."""
-        return (0 <= x < self.width and 0 <= y < self.height and
-                self.tiles[y][x] in (TILE_FLOOR, TILE_STAIRS_DOWN, TILE_STAIRS_UP))
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.walkable[y, x])
 
     def is_transparent(self, x, y):
         """Check if a tile allows light to pass through."""
-        return (0 <= x < self.width and 0 <= y < self.height and
-                self.tiles[y][x] in (TILE_FLOOR, TILE_STAIRS_DOWN, TILE_STAIRS_UP))
\ No newline at end of file
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.transparent[y, x])
+
+    def walkable_at(self, xs, ys):
+        """
+        Vectorized walkability test.
+
+        Args:
+            xs: Array-like of x-coordinates.
+            ys: Array-like of y-coordinates (same shape as xs).
+
+        Returns:
+            numpy.ndarray: Bool array; out-of-bounds coordinates are False.
+        """
+        return self._lookup(self.walkable, xs, ys)
+
+    def transparent_at(self, xs, ys):
+        """
+        Vectorized transparency test.
+
+        Args:
+            xs: Array-like of x-coordinates.
+            ys: Array-like of y-coordinates (same shape as xs).
+
+        Returns:
+            numpy.ndarray: Bool array; out-of-bounds coordinates are False.
+        """
+        return self._lookup(self.transparent, xs, ys)
+
+    def _lookup(self, mask, xs, ys):
+        """Gather mask values at the given coordinates, False out of bounds."""
+        xs = np.asarray(xs, dtype=np.intp)
+        ys = np.asarray(ys, dtype=np.intp)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        result = np.zeros(inside.shape, dtype=bool)
+        result[inside] = mask[ys[inside], xs[inside]]
+        return result
+
+    def mark_explored(self, mask, left=0, top=0):
+        """
+        Mark every tile set in a bool mask as explored.
+
+        Args:
+            mask (numpy.ndarray): Bool mask of a map area, such as a
+                Visibility window; the whole map by default.
+            left (int): X-coordinate of the mask's top-left tile.
+            top (int): Y-coordinate of the mask's top-left tile.
+        """
+        height, width = mask.shape
+        explored = self.explored[top:top + height, left:left + width]
+        if (mask & ~explored).any():
+            explored |= mask
+            self.explored_version += 1
+            self.explored_bounds = (left, top, left + width, top + height)
@@ -3,13 +3,14 @@
 
 import pygame
 from constants import *
+from ui import get_font
 
 class Menu:
     """Manages the startup menu."""
     def __init__(self, screen):
         self.screen = screen
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 24)
+        self.font = get_font(48)
+        self.small_font = get_font(24)
         self.buttons = [
             {"text": "New Game", "rect": pygame.Rect(300, 200, 200, 50)},
             {"text": "Load Game", "rect": pygame.Rect(300, 270, 200, 50)},
@@ -47,8 +48,8 @@ class CharacterCreation:
     """Manages the character creation screen."""
     def __init__(self, screen):
         self.screen = screen
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        self.font = get_font(36)
+        self.small_font = get_font(24)
         self.name = ""
         self.classes = ["Warrior", "Mage", "Rogue"]
         self.selected_class = 0
@@ -0,0 +1,85 @@
+# minimap.py
+"""Minimap of the explored dungeon, built from the map arrays."""
+
+import numpy as np
+import pygame
+from constants import *
+
+# Color lookup table indexed by tile id, with UNEXPLORED for unknown tiles.
+UNEXPLORED = 4
+MINIMAP_COLORS = np.array([COLOR_GRAY, COLOR_DARK_GRAY, COLOR_YELLOW, COLOR_YELLOW, COLOR_BLACK],
+                          dtype=np.uint8)
+
+class Minimap:
+    """
+    Overview of the explored part of the current level.
+
+    ``pixels`` holds one RGB color per map tile in surfarray (x, y) order and
+    is painted from ``Map.tiles`` and ``Map.explored`` through a color
+    lookup table. It is repainted only where tiles were newly explored,
+    and in full when the map or its layout changes. Each draw copies the
+    MINIMAP_WIDTH x MINIMAP_HEIGHT tiles around the player, marks the given
+    entities on the copy and blits it scaled by MINIMAP_SCALE.
+    """
+    def __init__(self, x, y, width=MINIMAP_WIDTH, height=MINIMAP_HEIGHT, scale=MINIMAP_SCALE):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.map = None
+        self.map_version = None
+        self.explored_version = None
+        self.pixels = None
+        self.surface = None
+        self.rect = pygame.Rect(x, y, width * scale, height * scale)
+
+    def sync(self, game_map):
+        """Bring ``pixels`` up to date with a map's tiles and explored grid."""
+        if game_map is not self.map or game_map.version != self.map_version:
+            self.map = game_map
+            self.map_version = game_map.version
+            self.pixels = np.zeros((game_map.width, game_map.height, 3), dtype=np.uint8)
+            self.paint(0, 0, game_map.width, game_map.height)
+        elif game_map.explored_version == self.explored_version + 1:
+            self.paint(*game_map.explored_bounds)
+        elif game_map.explored_version != self.explored_version:
+            self.paint(0, 0, game_map.width, game_map.height)
+        self.explored_version = game_map.explored_version
+
+    def paint(self, left, top, right, bottom):
+        """Recolor the tiles of a map area from the lookup table."""
+        tiles = self.map.tiles[top:bottom, left:right]
+        codes = np.where(self.map.explored[top:bottom, left:right], tiles, UNEXPLORED)
+        self.pixels[left:right, top:bottom] = MINIMAP_COLORS[codes.T]
+
+    def draw(self, screen, game, entities):
+        """
+        Draw the minimap around the player.
+
+        Args:
+            screen: Surface to draw on.
+            game: Game whose current level is shown.
+            entities (list): Visible entities to mark; later ones are drawn
+                over earlier ones, so the player should come last.
+
+        Returns:
+            pygame.Rect: The screen area drawn.
+        """
+        game_map = game.map
+        self.sync(game_map)
+        width, height = min(self.width, game_map.width), min(self.height, game_map.height)
+        left = min(max(game.player.x - width // 2, 0), game_map.width - width)
+        top = min(max(game.player.y - height // 2, 0), game_map.height - height)
+        view = self.pixels[left:left + width, top:top + height].copy()
+        for entity in entities:
+            if left <= entity.x < left + width and top <= entity.y < top + height:
+                view[entity.x - left, entity.y - top] = entity.color
+        if self.surface is None or self.surface.get_size() != (width, height):
+            self.surface = pygame.Surface((width, height))
+        pygame.surfarray.blit_array(self.surface, view)
+        # Scaling straight into the screen saves a separate blit.
+        self.rect = pygame.Rect(self.x, self.y, width * self.scale, height * self.scale)
+        pygame.transform.scale(self.surface, self.rect.size, screen.subsurface(self.rect))
+        pygame.draw.rect(screen, COLOR_WHITE, self.rect.inflate(2, 2), 1)
+        return self.rect.inflate(2, 2)
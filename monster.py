@@ -3,39 +3,73 @@
 
 import random
 from entity import Entity
+from components import KIND_MONSTER, component
+from scheduler import NORMAL_SPEED
 from constants import *
 
+CHASE_RANGE = 5
+
 class Monster(Entity):
     """An enemy monster with stats and behavior."""
-    def __init__(self, x, y, name="Goblin", health=20, strength=5, defense=2):
-        super().__init__(x, y, MONSTER_CHAR, COLOR_RED)
+    __slots__ = ('name',)
+    kind = KIND_MONSTER
+    health = component('health')
+    strength = component('strength')
+    defense = component('defense')
+    xp_value = component('xp_value')
+    speed = component('speed')
+
+    def __init__(self, x, y, name="Goblin", health=20, strength=5, defense=2, store=None, speed=NORMAL_SPEED):
+        super().__init__(x, y, MONSTER_CHAR, COLOR_RED, store)
         self.name = name
         self.health = health
         self.strength = strength
         self.defense = defense
         self.xp_value = 10
+        self.speed = speed
 
-    def attack(self, target):
+    def attack(self, target, rng=random):
         """
         Attack a target entity.
 
+        Args:
+            target: Entity to attack.
+            rng: Random source for the damage roll (random.Random or the
+                ``random`` module).
+
         Returns:
             int: Damage dealt.
         """
-        damage = max(0, self.strength - target.defense + random.randint(-1, 1))
+        damage = max(0, self.strength - target.defense + rng.randint(-1, 1))
         target.health -= damage
         return damage
 
-    def update(self, player, game_map):
-        """Update monster behavior (chase player if nearby)."""
+    def update(self, player, game_map, flow_field=None, occupied=None):
+        """
+        Update monster behavior (chase player if nearby).
+
+        Args:
+            player: The player to chase.
+            game_map: Map the monster is on.
+            flow_field (FlowField): Optional distance map to the player. When
+                given the monster follows it around walls; otherwise it steps
+                straight toward the player.
+            occupied (SpatialIndex): Optional index of the other monsters;
+                the monster never steps into a cell one of them holds.
+        """
         dx = player.x - self.x
         dy = player.y - self.y
         dist = max(abs(dx), abs(dy))
-        if dist <= 5:  # Chase range
+        if dist <= CHASE_RANGE:
             if dist == 1:
                 return  # Attack handled elsewhere
+            if flow_field is not None:
+                step = flow_field.next_step(self.x, self.y, occupied)
+                if step is not None:
+                    self.move(*step)
+                return
             move_x = 1 if dx > 0 else -1 if dx < 0 else 0
             move_y = 1 if dy > 0 else -1 if dy < 0 else 0
             new_x, new_y = self.x + move_x, self.y + move_y
-            if game_map.is_walkable(new_x, new_y):
+            if game_map.is_walkable(new_x, new_y) and (occupied is None or occupied.first_at(new_x, new_y) is None):
                 self.move(move_x, move_y)
\ No newline at end of file
@@ -0,0 +1,292 @@
+# pathfinding.py
+"""Pathfinding over the map's walkable grid."""
+
+from array import array
+from collections import OrderedDict
+from heapq import heappop, heappush
+import numpy as np
+
+# Distance value for cells the search did not reach.
+UNREACHABLE = np.iinfo(np.int32).max
+
+# The eight king-move directions monsters can step in.
+DIRECTIONS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+def dilate(mask):
+    """Grow a bool mask by one cell in all eight directions."""
+    grown = mask.copy()
+    grown[1:, :] |= mask[:-1, :]
+    grown[:-1, :] |= mask[1:, :]
+    grown[:, 1:] |= mask[:, :-1]
+    grown[:, :-1] |= mask[:, 1:]
+    grown[1:, 1:] |= mask[:-1, :-1]
+    grown[1:, :-1] |= mask[:-1, 1:]
+    grown[:-1, 1:] |= mask[1:, :-1]
+    grown[:-1, :-1] |= mask[1:, 1:]
+    return grown
+
+class FlowField:
+    """
+    Distance map from a goal, shared by every entity heading there.
+
+    Built once with a vectorized breadth-first search over the walkable mask
+    (one dilation per distance step). Only the window within ``max_distance``
+    of the goal is searched, since nothing farther can be reached in that
+    many steps. ``next_step`` then answers in O(1) per entity. The field
+    ignores other entities; callers moving several entities along it pass
+    ``next_step`` an index of the occupied cells.
+    """
+    def __init__(self, game_map, goal_x, goal_y, max_distance):
+        self.goal = (goal_x, goal_y)
+        self.left = max(goal_x - max_distance, 0)
+        self.top = max(goal_y - max_distance, 0)
+        right = min(goal_x + max_distance + 1, game_map.width)
+        bottom = min(goal_y + max_distance + 1, game_map.height)
+        walkable = game_map.walkable[self.top:bottom, self.left:right]
+        self.distances = np.full(walkable.shape, UNREACHABLE, dtype=np.int32)
+        frontier = np.zeros(walkable.shape, dtype=bool)
+        frontier[goal_y - self.top, goal_x - self.left] = True
+        reached = frontier.copy()
+        self.distances[frontier] = 0
+        for distance in range(1, max_distance + 1):
+            frontier = dilate(frontier) & walkable & ~reached
+            if not frontier.any():
+                break
+            self.distances[frontier] = distance
+            reached |= frontier
+
+    def distance(self, x, y):
+        """Return the number of steps from (x, y) to the goal, or UNREACHABLE."""
+        x -= self.left
+        y -= self.top
+        height, width = self.distances.shape
+        if 0 <= x < width and 0 <= y < height:
+            return int(self.distances[y, x])
+        return UNREACHABLE
+
+    def next_step(self, x, y, occupied=None):
+        """
+        Choose the move that gets closest to the goal.
+
+        Args:
+            x (int): X-coordinate to step from.
+            y (int): Y-coordinate to step from.
+            occupied (SpatialIndex): Optional index of entities whose cells
+                may not be stepped into.
+
+        Returns:
+            tuple: (dx, dy) of the best free step, or None if no free
+            neighbour is closer than (x, y) itself.
+        """
+        best = self.distance(x, y)
+        step = None
+        for dx, dy in DIRECTIONS:
+            distance = self.distance(x + dx, y + dy)
+            if distance < best and (occupied is None or occupied.first_at(x + dx, y + dy) is None):
+                best = distance
+                step = (dx, dy)
+        return step
+
+    def next_steps(self, xs, ys):
+        """
+        Vectorized next_step for many positions at once.
+
+        Args:
+            xs (numpy.ndarray): X-coordinates.
+            ys (numpy.ndarray): Y-coordinates.
+
+        Returns:
+            tuple: (dxs, dys) arrays; (0, 0) where no neighbour is closer.
+        """
+        height, width = self.distances.shape
+        padded = np.full((height + 2, width + 2), UNREACHABLE, dtype=np.int32)
+        padded[1:-1, 1:-1] = self.distances
+        # Local coordinates in the padded grid. Positions beyond its border
+        # have no neighbour inside the searched window, so never move.
+        local_x = xs - self.left + 1
+        local_y = ys - self.top + 1
+        inside = (local_x >= 0) & (local_x <= width + 1) & (local_y >= 0) & (local_y <= height + 1)
+        local_x = np.where(inside, local_x, 0)
+        local_y = np.where(inside, local_y, 0)
+        offsets = np.array(DIRECTIONS)
+        neighbors = padded[np.clip(local_y[:, None] + offsets[:, 1], 0, height + 1),
+                           np.clip(local_x[:, None] + offsets[:, 0], 0, width + 1)]
+        best = neighbors.argmin(axis=1)
+        closer = inside & (neighbors[np.arange(len(best)), best] < padded[local_y, local_x])
+        return np.where(closer, offsets[best, 0], 0), np.where(closer, offsets[best, 1], 0)
+
+def astar(walkable, width, height, start, goal):
+    """
+    Find a shortest king-move path with A*.
+
+    Args:
+        walkable (bytes): Row-major walkable flags, one byte per tile.
+        width (int): Map width.
+        height (int): Map height.
+        start (tuple): (x, y) to start from.
+        goal (tuple): (x, y) to reach.
+
+    Returns:
+        list: (x, y) steps after ``start`` up to and including ``goal``, or
+        None if the goal cannot be reached or either point is off the map.
+    """
+    goal_x, goal_y = goal
+    if not (0 <= start[0] < width and 0 <= start[1] < height and 0 <= goal_x < width and 0 <= goal_y < height):
+        return None
+    start_index = start[1] * width + start[0]
+    goal_index = goal_y * width + goal_x
+    if not walkable[goal_index]:
+        return None
+    area = width * height
+    costs = array('i', [-1]) * area
+    parents = array('i', [-1]) * area
+    closed = bytearray(area)
+    costs[start_index] = 0
+    heap = [(max(abs(goal_x - start[0]), abs(goal_y - start[1])), 0, start_index)]
+    while heap:
+        _, neg_cost, index = heappop(heap)
+        if closed[index]:
+            continue
+        if index == goal_index:
+            path = []
+            while index != start_index:
+                path.append((index % width, index // width))
+                index = parents[index]
+            path.reverse()
+            return path
+        closed[index] = 1
+        y, x = divmod(index, width)
+        cost = 1 - neg_cost
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbor = ny * width + nx
+                if walkable[neighbor] and not closed[neighbor]:
+                    known = costs[neighbor]
+                    if known < 0 or cost < known:
+                        costs[neighbor] = cost
+                        parents[neighbor] = index
+                        # Ties on f prefer the deeper node (larger cost).
+                        heappush(heap, (cost + max(abs(goal_x - nx), abs(goal_y - ny)), -cost, neighbor))
+    return None
+
+class PathFinder:
+    """
+    Point-to-point path service with a path cache.
+
+    Paths are cached under (start, goal, map version). A request that misses
+    is answered, in order of preference, by the tail of a cached path to the
+    same goal that passes through ``start``, by repairing the last path
+    between the same points from an older map version (only the broken
+    stretches are searched again), or by a full A* search. The finder serves
+    one map at a time and clears itself when handed another. Paths never
+    enter tiles whose type is in ``avoid``.
+    """
+    def __init__(self, maxsize=64, avoid=()):
+        self.maxsize = maxsize
+        self.avoid = tuple(avoid)
+        self.paths = OrderedDict()
+        self.map = None
+        self.hits = 0
+        self.misses = 0
+        self.repairs = 0
+        self._walkable = None
+        self._walkable_version = None
+
+    def find_path(self, game_map, start, goal):
+        """
+        Return a path between two tiles.
+
+        Args:
+            game_map: Map to search.
+            start (tuple): (x, y) to start from.
+            goal (tuple): (x, y) to reach.
+
+        Returns:
+            list: (x, y) steps after ``start`` up to and including ``goal``,
+            or None if the goal cannot be reached.
+        """
+        if game_map is not self.map:
+            self.clear()
+            self.map = game_map
+        key = (start, goal, game_map.version)
+        path = self.paths.get(key)
+        if path is not None:
+            self.paths.move_to_end(key)
+            self.hits += 1
+            return list(path)
+        walkable = self._walkable_bytes(game_map)
+        path = self._reuse(start, goal, game_map.version)
+        if path is None:
+            path = self._repair(walkable, game_map, start, goal)
+        if path is None:
+            self.misses += 1
+            path = astar(walkable, game_map.width, game_map.height, start, goal)
+            if path is None:
+                return None
+        self._store(key, path)
+        return list(path)
+
+    def clear(self):
+        """Drop all cached paths and reset the statistics."""
+        self.paths.clear()
+        self.map = None
+        self.hits = self.misses = self.repairs = 0
+        self._walkable = self._walkable_version = None
+
+    def _walkable_bytes(self, game_map):
+        """Return the map's walkable mask, less avoided tiles, as flat bytes, rebuilt per version."""
+        if self._walkable_version != game_map.version:
+            walkable = game_map.walkable
+            if self.avoid:
+                walkable = walkable & ~np.isin(game_map.tiles, self.avoid)
+            self._walkable = walkable.tobytes()
+            self._walkable_version = game_map.version
+        return self._walkable
+
+    def _store(self, key, path):
+        """Insert a path, evicting the least recently used one if full."""
+        self.paths[key] = tuple(path)
+        self.paths.move_to_end(key)
+        if len(self.paths) > self.maxsize:
+            self.paths.popitem(last=False)
+
+    def _reuse(self, start, goal, version):
+        """Return the tail of a current cached path to goal through start."""
+        for (_, path_goal, path_version), path in self.paths.items():
+            if path_goal == goal and path_version == version and start in path:
+                self.hits += 1
+                return list(path[path.index(start) + 1:])
+        return None
+
+    def _repair(self, walkable, game_map, start, goal):
+        """Patch the newest outdated path between start and goal, if any."""
+        old = None
+        for (path_start, path_goal, _), path in reversed(self.paths.items()):
+            if path_start == start and path_goal == goal:
+                old = path
+                break
+        if old is None:
+            return None
+        width = game_map.width
+        path = list(old)
+        broken = 0
+        # Detour around each blocked stretch in turn; detours are walkable,
+        # so the scan resumes after them.
+        while True:
+            broken = next((i for i in range(broken, len(path)) if not walkable[path[i][1] * width + path[i][0]]),
+                          None)
+            if broken is None:
+                break
+            rejoin = next((i for i in range(broken + 1, len(path)) if walkable[path[i][1] * width + path[i][0]]),
+                          None)
+            if rejoin is None:
+                return None
+            anchor = path[broken - 1] if broken else start
+            detour = astar(walkable, width, game_map.height, anchor, path[rejoin])
+            if detour is None:
+                return None
+            path[broken:rejoin + 1] = detour
+            broken += len(detour)
+        self.repairs += 1
+        return path
@@ -3,12 +3,20 @@
 
 import random
 from entity import Entity
+from components import KIND_PLAYER, component
 from constants import *
 
 class Player(Entity):
     """The player character with stats and inventory."""
-    def __init__(self, x, y):
-        super().__init__(x, y, PLAYER_CHAR, COLOR_WHITE)
+    __slots__ = ('inventory', 'level', 'xp', 'xp_to_level')
+    kind = KIND_PLAYER
+    health = component('health')
+    max_health = component('max_health')
+    strength = component('strength')
+    defense = component('defense')
+
+    def __init__(self, x, y, store=None):
+        super().__init__(x, y, PLAYER_CHAR, COLOR_WHITE, store)
         self.health = 100
         self.max_health = 100
         self.strength = 10
@@ -18,17 +26,19 @@ class Player(Entity):
         self.xp = 0
         self.xp_to_level = 50
 
-    def attack(self, target):
+    def attack(self, target, rng=random):
         """
         Attack a target entity.
 
         Args:
             target: Entity to attack.
+            rng: Random source for the damage roll (random.Random or the
+                ``random`` module).
 
         Returns:
             int: Damage dealt.
         """
-        damage = max(0, self.strength - target.defense + random.randint(-2, 2))
+        damage = max(0, self.strength - target.defense + rng.randint(-2, 2))
         target.health -= damage
         return damage
 
@@ -49,6 +59,7 @@ class Player(Entity):
         if 0 <= index < len(self.inventory):
             item = self.inventory.pop(index)
             item.effect(self)
+            item.release()
 
     def gain_xp(self, amount):
         """Gain experience points and level up if needed."""
@@ -0,0 +1,177 @@
+# profiler.py
+"""Optional per-phase timing and counters for game turns."""
+
+from collections import defaultdict, deque
+import json
+import time
+
+class Phase:
+    """Context manager that times one phase on its profiler's phase stack."""
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.open_phases.append((self.name, time.perf_counter_ns()))
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        open_phases = self.profiler.open_phases
+        name, start = open_phases.pop()
+        # A phase nested inside itself is timed once, by its outermost entry.
+        if all(name != outer for outer, _ in open_phases):
+            self.profiler.add_time(name, end - start)
+        return False
+
+class NullPhase:
+    """Phase that does nothing, used while profiling is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_PHASE = NullPhase()
+
+class Profiler:
+    """
+    Per-phase timers, counters and rolling histograms for game turns.
+
+    Code under measurement wraps each phase in ``with profiler.phase(name)``
+    and reports work done with ``profiler.count(name, n)``. Start times live
+    on a stack, so phases may nest, including inside a phase of the same
+    name. ``end_turn`` and ``end_frame`` close a turn or frame record holding
+    the time per phase and the counters since the previous record, so drawing
+    is never charged to a game turn; the last ``window`` records are kept, and
+    summary statistics and histograms are computed over them.
+
+    While ``enabled`` is false ``phase`` returns a shared no-op context
+    manager and ``count`` returns at once, so instrumented code costs only a
+    method call.
+    """
+    def __init__(self, enabled=True, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self.phases = {}
+        self.open_phases = []
+        self.current_times = defaultdict(int)
+        self.current_counts = defaultdict(int)
+        self.records = deque(maxlen=window)
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.totals = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.turn = 0
+        self.frame = 0
+
+    def phase(self, name):
+        """Return a context manager that times a named phase."""
+        if not self.enabled:
+            return NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+        return phase
+
+    def add_time(self, name, ns):
+        """Record ``ns`` nanoseconds spent in a phase."""
+        self.current_times[name] += ns
+        self.samples[name].append(ns)
+        self.totals[name] += ns
+        self.calls[name] += 1
+
+    def count(self, name, n=1):
+        """Add ``n`` to a counter for the current turn."""
+        if self.enabled:
+            self.current_counts[name] += n
+
+    def end_turn(self):
+        """Close the current turn record."""
+        if self.enabled:
+            self.turn += 1
+            self._close("turn", self.turn)
+
+    def end_frame(self):
+        """Close the current frame record."""
+        if self.enabled:
+            self.frame += 1
+            self._close("frame", self.frame)
+
+    def _close(self, kind, number):
+        """Append a record of the given kind for the time and counters gathered since the last one."""
+        self.records.append({
+            kind: number,
+            "phases_ns": dict(self.current_times),
+            "counters": dict(self.current_counts),
+        })
+        self.current_times.clear()
+        self.current_counts.clear()
+
+    def histogram(self, name):
+        """
+        Bucket the recent durations of a phase by powers of two.
+
+        Returns:
+            dict: Upper bound in microseconds -> number of samples at or below
+            it (and above the previous bound).
+        """
+        buckets = defaultdict(int)
+        for ns in self.samples.get(name, ()):
+            bound = 1
+            while bound * 1000 < ns:
+                bound *= 2
+            buckets[bound] += 1
+        return dict(sorted(buckets.items()))
+
+    def stats(self):
+        """
+        Summarize every phase seen so far.
+
+        Returns:
+            dict: Phase name -> calls, total_us, and the mean, median, p90,
+            p99 and max of the recent samples in microseconds.
+        """
+        result = {}
+        for name, samples in self.samples.items():
+            recent = sorted(samples)
+            count = len(recent)
+            result[name] = {
+                "calls": self.calls[name],
+                "total_us": self.totals[name] / 1000,
+                "mean_us": sum(recent) / count / 1000,
+                "median_us": recent[count // 2] / 1000,
+                "p90_us": recent[min(int(count * 0.9), count - 1)] / 1000,
+                "p99_us": recent[min(int(count * 0.99), count - 1)] / 1000,
+                "max_us": recent[-1] / 1000,
+            }
+        return result
+
+    def counters(self):
+        """Return the counters summed over the recent turn and frame records."""
+        totals = defaultdict(int)
+        for record in self.records:
+            for name, n in record["counters"].items():
+                totals[name] += n
+        return dict(totals)
+
+    def export(self, path):
+        """Write the recent turn and frame records to a file as JSON lines."""
+        with open(path, 'w') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
+
+    def reset(self):
+        """Discard all records and statistics."""
+        self.current_times.clear()
+        self.current_counts.clear()
+        self.records.clear()
+        self.samples.clear()
+        self.totals.clear()
+        self.calls.clear()
+        self.open_phases.clear()
+        self.turn = 0
+        self.frame = 0
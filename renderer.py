@@ -0,0 +1,211 @@
+# renderer.py
+"""Game rendering: cached map surfaces with dirty-rectangle tracking."""
+
+import numpy as np
+import pygame
+from constants import *
+from ui import HealthBar, InventoryScreen
+from camera import Camera
+from atlas import SpriteAtlas
+from minimap import Minimap
+from lighting import LIGHT_SCALE
+
+# Palette indexed by draw code: the tile id plus TILE_KINDS times the light
+# shade for tiles in view, the tile id plus REMEMBERED for explored tiles
+# out of view, and UNSEEN for the rest. Shades run from dimmest to
+# brightest and scale the lit tile colors by SHADE_FACTORS.
+TILE_KINDS = 4
+LIT_COLORS = (COLOR_GRAY, COLOR_BLACK, COLOR_YELLOW, COLOR_YELLOW)
+SHADE_FACTORS = (0.6, 0.75, 0.9, 1.0)
+SHADES = len(SHADE_FACTORS)
+REMEMBERED = SHADES * TILE_KINDS
+UNSEEN = REMEMBERED + TILE_KINDS
+PALETTE = tuple(tuple(int(channel * factor) for channel in color)
+                for factor in SHADE_FACTORS for color in LIT_COLORS) + \
+          (COLOR_DARK_GRAY, COLOR_BLACK, COLOR_BLACK, COLOR_BLACK, COLOR_BLACK)
+
+def light_shades(levels):
+    """Quantize light levels to shade indices."""
+    return np.clip(levels * SHADES // LIGHT_SCALE, 0, SHADES - 1).astype(np.int16)
+
+def tile_codes(tiles, visible, explored, shades=None):
+    """Return the palette index for every tile of a region; without shades visible tiles are fully lit."""
+    tiles = tiles.astype(np.int16)
+    lit = tiles + (SHADES - 1 if shades is None else shades) * TILE_KINDS
+    return np.where(visible, lit, np.where(explored, tiles + REMEMBERED, UNSEEN))
+
+def shift_grid(grid, dx, dy, fill):
+    """Return a copy of a 2D grid moved by (-dx, -dy) cells, filling the exposed edge."""
+    height, width = grid.shape
+    shifted = np.full_like(grid, fill)
+    if abs(dx) < width and abs(dy) < height:
+        shifted[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)] = \
+            grid[max(dy, 0):height - max(-dy, 0), max(dx, 0):width - max(-dx, 0)]
+    return shifted
+
+class MapRenderer:
+    """
+    Keeps a composed surface of the camera's view and redraws only tiles
+    whose appearance changed.
+
+    ``drawn`` records the palette index last painted in each view cell, so a
+    refresh only touches cells whose code differs. When the camera scrolls
+    the surface and ``drawn`` are shifted along with it and only the newly
+    exposed edge needs painting, though the whole surface is reported dirty
+    since every pixel moved on screen; the Camera scrolls in rare jumps, so
+    most refreshes stay partial. Work per refresh depends on the size of the
+    view, never on the size of the map. Changed cells are painted from the
+    sprite atlas in one batched blit.
+    """
+    def __init__(self, camera, atlas=None):
+        self.camera = camera
+        size = camera.tile_size
+        self.atlas = atlas if atlas is not None else SpriteAtlas(size)
+        self.tile_rects = [self.atlas.add_color(('tile', code), color) for code, color in enumerate(PALETTE)]
+        self.surface = pygame.Surface((camera.width * size, camera.height * size))
+        self.drawn = np.full((camera.height, camera.width), -1, dtype=np.int16)
+        self.origin = (camera.x, camera.y)
+        self.map = None
+
+    def invalidate(self):
+        """Forget what was drawn so the next refresh repaints every tile."""
+        self.map = None
+
+    def refresh(self, game_map, visible, explored, light=None):
+        """
+        Bring the composed surface up to date with the camera's view.
+
+        Args:
+            game_map: Map being drawn.
+            visible (Visibility): Tiles in view.
+            explored (numpy.ndarray): (height, width) bool mask of explored tiles.
+            light (numpy.ndarray): Optional (height, width) light levels that
+                shade the visible tiles.
+
+        Returns:
+            list: pygame.Rect areas of ``surface`` that changed.
+        """
+        camera = self.camera
+        size = camera.tile_size
+        dx, dy = camera.x - self.origin[0], camera.y - self.origin[1]
+        full = game_map is not self.map or dx or dy
+        if game_map is not self.map:
+            self.map = game_map
+            self.drawn.fill(-1)
+        elif dx or dy:
+            self.surface.scroll(-dx * size, -dy * size)
+            self.drawn = shift_grid(self.drawn, dx, dy, -1)
+        self.origin = (camera.x, camera.y)
+
+        left, top = camera.x, camera.y
+        right = min(left + camera.width, game_map.width)
+        bottom = min(top + camera.height, game_map.height)
+        codes = np.full(self.drawn.shape, UNSEEN, dtype=np.int16)
+        shades = None if light is None else light_shades(light[top:bottom, left:right])
+        codes[:bottom - top, :right - left] = tile_codes(game_map.tiles[top:bottom, left:right],
+                                                          visible.crop(left, top, right, bottom),
+                                                          explored[top:bottom, left:right], shades)
+        ys, xs = np.nonzero(codes != self.drawn)
+        sheet, tile_rects = self.atlas.surface, self.tile_rects
+        dirty = self.surface.blits([(sheet, (x, y), tile_rects[code])
+                                    for x, y, code in zip((xs * size).tolist(), (ys * size).tolist(),
+                                                          codes[ys, xs].tolist())])
+        self.drawn = codes
+        if full:
+            return [self.surface.get_rect()]
+        return dirty
+
+class GameView:
+    """
+    Draws a Game onto the screen; attached to the game as an observer.
+
+    A Camera follows the player and only the part of the map inside it is
+    drawn, with visible tiles shaded by the game's light levels. The map
+    comes from a MapRenderer's cached surface, so only tiles whose
+    appearance changed, the squares entities left or entered, and the UI
+    (when its content changed) are redrawn. When no game event arrived and
+    neither the game state nor the UI content changed since the last call,
+    ``draw`` does nothing and reports no dirty areas. Entities are drawn
+    from the same sprite atlas as the map, in one batched blit. While
+    ``show_minimap`` is set a Minimap is shown at the right end of the UI
+    strip below the map, where it never hides the playfield.
+    """
+    def __init__(self):
+        self.camera = Camera()
+        self.atlas = SpriteAtlas(self.camera.tile_size)
+        self.renderer = MapRenderer(self.camera, self.atlas)
+        self.health_bar = HealthBar(10, MAP_SCREEN_HEIGHT + 10, 200, 20)
+        self.inventory_screen = InventoryScreen(SCREEN_WIDTH // 4, SCREEN_HEIGHT // 4, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.minimap = Minimap(SCREEN_WIDTH - MINIMAP_WIDTH * MINIMAP_SCALE - 10, MAP_SCREEN_HEIGHT + 10)
+        self.show_minimap = True
+        self.entity_rects = []
+        self.drawn_state = None
+        self.drawn_ui = None
+        self.needs_redraw = True
+
+    def notify(self, game, event):
+        """Note that the game changed and the next draw has work to do."""
+        self.needs_redraw = True
+
+    def invalidate(self):
+        """Force the next draw to repaint the whole screen."""
+        self.drawn_state = None
+
+    def toggle_minimap(self):
+        """Show or hide the minimap."""
+        self.show_minimap = not self.show_minimap
+        self.invalidate()
+
+    def draw(self, game, screen):
+        """
+        Render the game state.
+
+        Returns:
+            list: pygame.Rect areas of the screen that changed, for
+            pygame.display.update; empty when nothing changed.
+        """
+        ui_state = (game.player.health, game.player.max_health, game.message_log.version)
+        if not self.needs_redraw and game.state == self.drawn_state and ui_state == self.drawn_ui:
+            return []
+        self.needs_redraw = False
+        camera = self.camera
+        camera.follow(game.player.x, game.player.y, game.map.width, game.map.height)
+        light = game.lighting.update(game.map)
+        dirty = self.renderer.refresh(game.map, game.visible, game.map.explored, light)
+        map_surface = self.renderer.surface
+        full_redraw = game.state != self.drawn_state
+        if full_redraw:
+            self.drawn_state = game.state
+            screen.fill(COLOR_BLACK)
+            screen.blit(map_surface, (0, 0))
+            dirty = [screen.get_rect()]
+        else:
+            dirty.extend(self.entity_rects)
+            screen.blits([(map_surface, rect, rect) for rect in dirty], doreturn=False)
+        visible = game.visible
+        entities = [entity for index in (game.item_index, game.monster_index)
+                    for entity in index.in_mask(visible.window, visible.left, visible.top)
+                    if camera.contains(entity.x, entity.y)]
+        entities.append(game.player)
+        size = camera.tile_size
+        left, top = camera.offset
+        # Resolve every sprite first: adding a new one may grow and replace the atlas surface.
+        sources = [self.atlas.entity_rect(entity) for entity in entities]
+        sheet = self.atlas.surface
+        self.entity_rects = screen.blits([(sheet, (entity.x * size + left, entity.y * size + top), source)
+                                          for entity, source in zip(entities, sources)])
+        dirty.extend(self.entity_rects)
+        if full_redraw or ui_state != self.drawn_ui:
+            self.drawn_ui = ui_state
+            ui_rect = pygame.Rect(0, MAP_SCREEN_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT - MAP_SCREEN_HEIGHT)
+            screen.fill(COLOR_BLACK, ui_rect)
+            self.health_bar.draw(screen, game.player)
+            game.message_log.draw(screen)
+            dirty.append(ui_rect)
+        if self.show_minimap:
+            dirty.append(self.minimap.draw(screen, game, entities))
+        if game.state == STATE_INVENTORY:
+            self.inventory_screen.draw(screen, game.player)
+            dirty.append(pygame.Rect(self.inventory_screen.x, self.inventory_screen.y,
+                                     self.inventory_screen.width, self.inventory_screen.height))
+        return dirty
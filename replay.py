@@ -0,0 +1,204 @@
+# replay.py
+"""
+Input recording and deterministic replay.
+
+A game is fully determined by its seed, map size, map generator and the
+player's inputs, so a Replay stores only those, plus optional state
+checksums taken every ``checksum_interval`` inputs to detect divergence on
+playback.
+
+Usage:
+    python replay.py FILE [--no-verify]
+"""
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+import numpy as np
+from game import Game
+from components import KIND_FREE
+from savegame import write_atomic
+from constants import *
+
+# File layout (little-endian): a header (ending in the NUL-padded ASCII name
+# of the map generator), the zlib-compressed inputs (two
+# bytes each: opcode and signed argument), then one uint32 checksum per
+# ``checksum_interval`` inputs.
+REPLAY_MAGIC = b'RPLY'
+REPLAY_VERSION = 2
+REPLAY_HEADER = struct.Struct('<4sHqHHIII16s')
+INPUT_DTYPE = np.dtype([('op', 'u1'), ('arg', 'i1')])
+OP_MOVE = 0
+OP_USE_ITEM = 1
+
+class ReplayMismatch(ValueError):
+    """Raised when a replayed game's state checksum differs from the recorded one."""
+
+def state_checksum(game):
+    """Return a CRC32 of the game state that inputs can affect."""
+    player = game.player
+    store = game.entity_store
+    live = store.kind[:store.size] != KIND_FREE
+    crc = zlib.crc32(struct.pack('<9iq', game.current_level, player.x, player.y, player.health,
+                                 player.max_health, player.strength, player.level, player.xp,
+                                 len(player.inventory), game.time))
+    for name in ('x', 'y', 'health'):
+        crc = zlib.crc32(getattr(store, name)[:store.size][live].tobytes(), crc)
+    return crc
+
+class Replay:
+    """
+    A seed, map size and generator name, and the stream of player inputs
+    that followed them.
+
+    Attach one to a new game with ``record``; Game then calls
+    ``record_action``/``record_use_item`` after every input.
+    """
+    def __init__(self, seed, width, height, checksum_interval=0, generator=DEFAULT_GENERATOR):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.generator = generator
+        self.checksum_interval = checksum_interval
+        self.inputs = bytearray()
+        self.checksums = []
+
+    def __len__(self):
+        return len(self.inputs) // INPUT_DTYPE.itemsize
+
+    def record_action(self, game, dx, dy):
+        """Append a process_action input."""
+        self._append(game, OP_MOVE, (dx + 1) * 3 + dy + 1)
+
+    def record_use_item(self, game, index):
+        """Append a use_item input."""
+        self._append(game, OP_USE_ITEM, index)
+
+    def _append(self, game, op, arg):
+        self.inputs += struct.pack('<Bb', op, arg)
+        if self.checksum_interval and len(self) % self.checksum_interval == 0:
+            self.checksums.append(state_checksum(game))
+
+    def to_bytes(self):
+        """Serialize the replay."""
+        inputs = zlib.compress(bytes(self.inputs), 9)
+        return b''.join([
+            REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.width, self.height,
+                               self.checksum_interval, len(inputs), len(self.checksums),
+                               self.generator.encode('ascii')),
+            inputs,
+            np.array(self.checksums, dtype='<u4').tobytes(),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Rebuild a replay from bytes written by to_bytes.
+
+        Raises:
+            ValueError: If the data is not a replay, has an unknown version
+                or is corrupt.
+        """
+        try:
+            magic, version, seed, width, height, interval, length, count, generator = \
+                REPLAY_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("Not a replay file") from None
+        if magic != REPLAY_MAGIC:
+            raise ValueError("Not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay format version {version}")
+        offset = REPLAY_HEADER.size
+        if offset + length + count * 4 > len(data):
+            raise ValueError("corrupt replay")
+        try:
+            replay = cls(seed, width, height, interval, generator.rstrip(b'\0').decode('ascii'))
+            replay.inputs = bytearray(zlib.decompress(data[offset:offset + length]))
+        except (zlib.error, UnicodeDecodeError) as e:
+            raise ValueError("corrupt replay") from e
+        if len(replay.inputs) % INPUT_DTYPE.itemsize:
+            raise ValueError("corrupt replay")
+        offset += length
+        replay.checksums = np.frombuffer(data, dtype='<u4', count=count, offset=offset).tolist()
+        return replay
+
+def record(game, checksum_interval=0):
+    """
+    Start recording a game's inputs.
+
+    Must be called before the first input, since a replay always starts
+    from the seed.
+
+    Returns:
+        Replay: The replay being recorded, also stored as ``game.recording``.
+    """
+    levels = game.levels
+    game.recording = Replay(game.seed, levels.width, levels.height, checksum_interval, levels.generator)
+    return game.recording
+
+def save_replay(replay, path=REPLAY_FILE):
+    """Write a replay to a file."""
+    write_atomic(path, replay.to_bytes())
+
+def load_replay(path=REPLAY_FILE):
+    """Read a replay from a file."""
+    with open(path, 'rb') as f:
+        return Replay.from_bytes(f.read())
+
+def replay_game(replay, verify=True, profiler=None):
+    """
+    Play a replay back in a headless game as fast as possible.
+
+    Args:
+        replay (Replay): Replay to play.
+        verify (bool): Compare state checksums wherever the replay has them.
+        profiler (Profiler): Optional profiler for the replayed game.
+
+    Returns:
+        Game: The game in its final state.
+
+    Raises:
+        ReplayMismatch: If a checksum differs from the recorded one.
+    """
+    game = Game(headless=True, seed=replay.seed, width=replay.width, height=replay.height,
+                profiler=profiler, generator=replay.generator)
+    interval = replay.checksum_interval if verify else 0
+    inputs = np.frombuffer(bytes(replay.inputs), dtype=INPUT_DTYPE)
+    for turn, (op, arg) in enumerate(inputs.tolist(), 1):
+        if op == OP_MOVE:
+            game.process_action(arg // 3 - 1, arg % 3 - 1)
+        else:
+            game.use_item(arg)
+        if interval and turn % interval == 0:
+            expected = replay.checksums[turn // interval - 1]
+            if state_checksum(game) != expected:
+                raise ReplayMismatch(f"State diverged from the recording by input {turn}")
+    return game
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Replay a recorded game headlessly.")
+    parser.add_argument('file', nargs='?', default=REPLAY_FILE, help="replay file")
+    parser.add_argument('--no-verify', action='store_true', help="skip checksum verification")
+    args = parser.parse_args(argv)
+
+    try:
+        replay = load_replay(args.file)
+    except (OSError, ValueError) as e:
+        print(f"Could not load replay: {e}")
+        return 1
+    start = time.perf_counter()
+    try:
+        game = replay_game(replay, verify=not args.no_verify)
+    except ReplayMismatch as e:
+        print(e)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(replay)} inputs in {elapsed:.3f} s ({len(replay) / max(elapsed, 1e-9):.0f}/s); "
+          f"level {game.current_level}, health {game.player.health}, state {game.state}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
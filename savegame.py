@@ -0,0 +1,199 @@
+# savegame.py
+"""Binary save and load of game state."""
+
+import os
+import struct
+import tempfile
+import threading
+import numpy as np
+from game import Game
+from generators import GENERATORS
+from item import ITEM_TYPES, create_item
+from levels import LevelSnapshot, read_source
+from constants import *
+
+# File layout (little-endian):
+#   header   magic, format version, seed, current level, level count, game time,
+#            map generator name (ASCII, NUL padded)
+#   player   x, y, health, max_health, strength, defense, level, xp, xp_to_level
+#   block    inventory item names, newline separated (length-prefixed)
+#   block    scheduled monsters of the current level as SCHEDULE_DTYPE records
+#   blocks   one LevelSnapshot per stored level, the current one first
+SAVE_MAGIC = b'RGSV'
+SAVE_VERSION = 4
+SAVE_HEADER = struct.Struct('<4sHqIIq16s')
+PLAYER_RECORD = struct.Struct('<9i')
+BLOCK_LENGTH = struct.Struct('<I')
+SCHEDULE_DTYPE = np.dtype([('monster', '<u4'), ('time', '<i8')])
+
+_write_lock = threading.Lock()
+
+def encode_game(game):
+    """
+    Serialize a game to bytes.
+
+    The current level is snapshotted on the spot; other visited levels come
+    from the game's level store.
+    """
+    return encode_captured(*capture_game(game))
+
+def capture_game(game):
+    """
+    Take what a save needs from a game, leaving the level data for later.
+
+    Returns:
+        tuple: (head, levels): the encoded header, player record, inventory
+        and schedule, then a snapshot of the current level followed by the
+        level store's other sources (see LevelStore.sources). Pass both to
+        encode_captured, on any thread.
+    """
+    player = game.player
+    levels = [LevelSnapshot.capture(game.current_level, game.map, game.monsters, game.items)]
+    levels.extend(source for number, source in game.level_store.sources() if number != game.current_level)
+    scheduler = game.scheduler
+    schedule = np.array([(i, scheduler.time_of(monster)) for i, monster in enumerate(game.monsters)
+                         if monster in scheduler], dtype=SCHEDULE_DTYPE)
+    parts = [
+        SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, game.seed, game.current_level, len(levels), game.time,
+                         game.levels.generator.encode('ascii')),
+        PLAYER_RECORD.pack(player.x, player.y, player.health, player.max_health, player.strength,
+                           player.defense, player.level, player.xp, player.xp_to_level),
+    ]
+    inventory = '\n'.join(item.name for item in player.inventory).encode('utf-8')
+    for block in (inventory, schedule.tobytes()):
+        parts.append(BLOCK_LENGTH.pack(len(block)))
+        parts.append(block)
+    return b''.join(parts), levels
+
+def encode_captured(head, levels):
+    """Finish a save captured by capture_game, serializing and reading its levels."""
+    parts = [head]
+    for source in levels:
+        block = read_source(source)
+        parts.append(BLOCK_LENGTH.pack(len(block)))
+        parts.append(block)
+    return b''.join(parts)
+
+def decode_game(data, headless=False, sound=None):
+    """
+    Rebuild a game from bytes written by encode_game.
+
+    The game is built straight from the saved state: no level is generated
+    on the way, except in the background for the levels next to the
+    current one.
+
+    Args:
+        data (bytes): Saved game.
+        headless (bool): Build a headless game.
+        sound (SoundManager): Optional audio to reuse in a windowed game.
+
+    Raises:
+        ValueError: If the data is not a save file, has an unknown version
+            or is corrupt.
+    """
+    try:
+        magic, version, seed, current_level, level_count, time, generator = SAVE_HEADER.unpack_from(data)
+    except struct.error:
+        raise ValueError("Not a save file") from None
+    if magic != SAVE_MAGIC:
+        raise ValueError("Not a save file")
+    if version != SAVE_VERSION:
+        raise ValueError(f"Unsupported save format version {version}")
+    try:
+        generator = generator.rstrip(b'\0').decode('ascii')
+        if generator not in GENERATORS:
+            raise ValueError("corrupt save")
+        offset = SAVE_HEADER.size
+        stats = PLAYER_RECORD.unpack_from(data, offset)
+        offset += PLAYER_RECORD.size
+        blocks = []
+        view = memoryview(data)
+        for _ in range(level_count + 2):
+            (length,) = BLOCK_LENGTH.unpack_from(data, offset)
+            offset += BLOCK_LENGTH.size
+            if offset + length > len(data):
+                raise ValueError("corrupt save")
+            blocks.append(view[offset:offset + length])
+            offset += length
+        names = bytes(blocks[0]).decode('utf-8')
+        names = names.split('\n') if names else []
+        if not set(names) <= set(ITEM_TYPES):
+            raise ValueError("corrupt save")
+        schedule = np.frombuffer(blocks[1], dtype=SCHEDULE_DTYPE).tolist()
+        snapshots = [LevelSnapshot.from_bytes(block) for block in blocks[2:]]
+        current = snapshots[0]
+        level = current.restore()
+        scheduled = [(level.monsters[i], t) for i, t in schedule]
+    except (struct.error, KeyError, IndexError) as e:
+        raise ValueError("corrupt save") from e
+
+    game = Game(headless=headless, seed=seed, width=current.width, height=current.height,
+                generator=generator, sound=sound, start=False)
+    for snapshot in snapshots[1:]:
+        game.level_store.put(snapshot)
+    game.current_level = current_level
+    game.time = time
+    game.initialize_level(level=level)
+    for monster, t in scheduled:
+        game.scheduler.schedule(monster, t)
+    player = game.player
+    (player.x, player.y, player.health, player.max_health, player.strength, player.defense,
+     player.level, player.xp, player.xp_to_level) = stats
+    player.inventory = [create_item(name, 0, 0, game.player_store) for name in names]
+    game.update_fov()
+    return game
+
+def write_atomic(path, data):
+    """Write data to path through a temporary file and an atomic rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with _write_lock:
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.save-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+def save_game(game, path=SAVE_FILE, background=True, on_done=None):
+    """
+    Save a game.
+
+    The state is captured immediately, so later moves do not leak into the
+    save; serializing the levels, reading spilled ones from disk and
+    writing the file happen on a background thread unless ``background`` is
+    false. When ``on_done`` is given it is called with None once the file
+    is written, or with the exception that stopped the write, on the writer
+    thread; without it errors are raised.
+
+    Returns:
+        threading.Thread: The writer thread (already finished when not in
+        the background).
+    """
+    captured = capture_game(game)
+    writer = threading.Thread(target=_write, args=(path, captured, on_done), name='savegame')
+    if background:
+        writer.start()
+    else:
+        writer.run()
+    return writer
+
+def _write(path, captured, on_done):
+    """Encode and write a captured save and report the outcome to on_done, if given."""
+    try:
+        write_atomic(path, encode_captured(*captured))
+    except Exception as e:
+        if on_done is None:
+            raise
+        on_done(e)
+    else:
+        if on_done is not None:
+            on_done(None)
+
+def load_game(path=SAVE_FILE, headless=False, sound=None):
+    """Load a game saved with save_game."""
+    with open(path, 'rb') as f:
+        return decode_game(f.read(), headless, sound)
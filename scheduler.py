@@ -0,0 +1,78 @@
+# scheduler.py
+"""Energy-based turn scheduling."""
+
+from heapq import heappop, heappush
+import itertools
+
+# Game time an action takes for an actor of NORMAL_SPEED; faster actors act
+# proportionally more often.
+ACTION_COST = 100
+NORMAL_SPEED = 100
+
+def action_delay(speed):
+    """Return the game time between two actions of an actor with a given speed."""
+    return max(1, ACTION_COST * NORMAL_SPEED // max(speed, 1))
+
+class Scheduler:
+    """
+    Priority queue of actors keyed by the game time of their next action.
+
+    Only actors that were scheduled are ever touched, so dormant actors cost
+    nothing. Removal is lazy: the heap entry is marked dead and skipped when
+    it reaches the top.
+    """
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, actor):
+        return actor in self.entries
+
+    def schedule(self, actor, time):
+        """Schedule (or reschedule) an actor's next action at a game time."""
+        self.remove(actor)
+        entry = [time, next(self.counter), actor, True]
+        self.entries[actor] = entry
+        heappush(self.heap, entry)
+
+    def remove(self, actor):
+        """Unschedule an actor, if it is scheduled."""
+        entry = self.entries.pop(actor, None)
+        if entry is not None:
+            entry[3] = False
+
+    def time_of(self, actor):
+        """Return the game time of an actor's next action, or None if it is not scheduled."""
+        entry = self.entries.get(actor)
+        return entry[0] if entry is not None else None
+
+    def clear(self):
+        """Unschedule every actor."""
+        self.heap.clear()
+        self.entries.clear()
+
+    def pop_batch(self, until):
+        """
+        Take every actor due at the earliest scheduled time, if that is no
+        later than ``until``.
+
+        Returns:
+            tuple: (time, actors); actors is empty when nothing is due.
+        """
+        heap = self.heap
+        while heap and not heap[0][3]:
+            heappop(heap)
+        if not heap or heap[0][0] > until:
+            return until, []
+        time = heap[0][0]
+        actors = []
+        while heap and heap[0][0] == time:
+            _, _, actor, alive = heappop(heap)
+            if alive:
+                del self.entries[actor]
+                actors.append(actor)
+        return time, actors
@@ -0,0 +1,238 @@
+# simulate.py
+"""
+Monte Carlo balance simulator.
+
+Plays many headless games with a scripted bot across a process pool and
+summarizes how deep the bot gets, how long each level takes, the damage
+dealt and received, and how experience grows with depth.
+
+Usage:
+    python simulate.py [--games 1000] [--workers N] [--seed 1]
+                       [--generator rooms] [--output results.json]
+
+Every game's seed is drawn from the master seed, and each game depends on
+nothing else, so results do not change with the number of workers.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+
+from game import Game
+from generators import GENERATORS
+from pathfinding import PathFinder
+from constants import *
+
+MAX_TURNS = 3000
+MAX_DEPTH = 20
+HEAL_THRESHOLD = 0.4
+NEIGHBOURS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+STUCK_TURNS = 20
+INVENTORY_LIMIT = 10  # as enforced by Player.add_item
+
+class StairsBot:
+    """
+    Scripted player: fight whatever is adjacent, drink a potion when hurt,
+    otherwise follow the shortest path to the down stairs. Other items are
+    used at once, and the oldest potion is drunk when the inventory is full
+    so items on the path never block it. Paths avoid the up stairs, which
+    would take the bot back a level.
+    """
+    def __init__(self, seed):
+        self.rng = random.Random(f"{seed}:bot")
+        self.map = None
+        self.stairs = None
+        self.path_finder = PathFinder(avoid=(TILE_STAIRS_UP,))
+        self.last_position = None
+        self.still = 0
+
+    def learn_map(self, game_map):
+        """Find the down stairs, once per map."""
+        self.map = game_map
+        found = np.argwhere(game_map.tiles == TILE_STAIRS_DOWN)
+        self.stairs = (int(found[0][1]), int(found[0][0])) if len(found) else None
+
+    def choose(self, game):
+        """
+        Pick the next input.
+
+        Returns:
+            tuple: ('use_item', index) or ('move', dx, dy).
+        """
+        player = game.player
+        if player.health < player.max_health * HEAL_THRESHOLD:
+            for i, item in enumerate(player.inventory):
+                if item.name == "Health Potion":
+                    return ('use_item', i)
+        for i, item in enumerate(player.inventory):
+            if item.name != "Health Potion" or len(player.inventory) >= INVENTORY_LIMIT:
+                return ('use_item', i)
+        for dx, dy in NEIGHBOURS:
+            if game.monster_index.first_at(player.x + dx, player.y + dy) is not None:
+                return ('move', dx, dy)
+        if game.map is not self.map:
+            self.learn_map(game.map)
+        position = (player.x, player.y)
+        self.still = self.still + 1 if position == self.last_position else 0
+        self.last_position = position
+        if self.stairs is not None and self.still < STUCK_TURNS:
+            path = self.path_finder.find_path(game.map, position, self.stairs)
+            if path:
+                return ('move', path[0][0] - player.x, path[0][1] - player.y)
+        return ('move',) + self.rng.choice(NEIGHBOURS)
+
+def play_game(seed, max_turns=MAX_TURNS, max_depth=MAX_DEPTH, generator=DEFAULT_GENERATOR):
+    """
+    Play one headless game with the StairsBot.
+
+    Returns:
+        dict: depth reached, whether the bot died, turns taken, turns spent
+        on each level, damage dealt and received, kills, and the character
+        level and total XP on arriving at each depth.
+    """
+    game = Game(headless=True, seed=seed, generator=generator)
+    bot = StairsBot(seed)
+    player = game.player
+    turns_per_level = [0]
+    level_at_depth = [player.level]
+    xp_at_depth = [0]
+    xp_total = damage_dealt = damage_taken = kills = turns = 0
+    while turns < max_turns and game.state != STATE_DEAD and game.current_level < max_depth:
+        action = bot.choose(game)
+        if action[0] == 'use_item':
+            game.use_item(action[1])
+            continue
+        _, dx, dy = action
+        depth = game.current_level
+        target = game.monster_index.first_at(player.x + dx, player.y + dy)
+        # Read the target's stats now: a kill releases its component slot.
+        target_health, target_xp = (target.health, target.xp_value) if target is not None else (0, 0)
+        health = player.health
+        game.process_action(dx, dy)
+        turns += 1
+        turns_per_level[-1] += 1
+        if target is not None:
+            if target in game.monsters:
+                damage_dealt += target_health - target.health
+            else:
+                damage_dealt += target_health
+                xp_total += target_xp
+                kills += 1
+        damage_taken += max(0, health - player.health)
+        if game.current_level > depth and game.current_level > len(turns_per_level):
+            turns_per_level.append(0)
+            level_at_depth.append(player.level)
+            xp_at_depth.append(xp_total)
+    return {
+        "seed": seed,
+        "depth": len(turns_per_level),
+        "died": game.state == STATE_DEAD,
+        "turns": turns,
+        "turns_per_level": turns_per_level,
+        "damage_dealt": damage_dealt,
+        "damage_taken": damage_taken,
+        "kills": kills,
+        "level_at_depth": level_at_depth,
+        "xp_at_depth": xp_at_depth,
+    }
+
+def game_seeds(master_seed, games):
+    """Derive the seed of every game from the master seed."""
+    rng = random.Random(master_seed)
+    return [rng.getrandbits(32) for _ in range(games)]
+
+def run(games, master_seed=1, workers=None, max_turns=MAX_TURNS, max_depth=MAX_DEPTH,
+        generator=DEFAULT_GENERATOR):
+    """
+    Play many games, in parallel unless ``workers`` is 1.
+
+    Returns:
+        list: play_game results, in seed order.
+    """
+    seeds = game_seeds(master_seed, games)
+    turns = [max_turns] * games
+    depths = [max_depth] * games
+    generators = [generator] * games
+    if workers == 1:
+        return list(map(play_game, seeds, turns, depths, generators))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, games // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(play_game, seeds, turns, depths, generators, chunksize=chunksize))
+
+def summarize(results):
+    """
+    Aggregate game results into per-depth tables.
+
+    Returns:
+        dict: Overall means and a ``depths`` table with, for each depth, the
+        share of games that reached it, the deaths there, mean turns spent
+        on it, and mean character level and XP on arrival.
+    """
+    count = len(results)
+    max_depth = max(result["depth"] for result in results)
+    depths = []
+    for depth in range(1, max_depth + 1):
+        reached = [r for r in results if r["depth"] >= depth]
+        finished = [r for r in reached if r["depth"] > depth]
+        depths.append({
+            "depth": depth,
+            "reached": len(reached) / count,
+            "died_here": sum(1 for r in reached if r["depth"] == depth and r["died"]),
+            "mean_turns": float(np.mean([r["turns_per_level"][depth - 1] for r in finished])) if finished else None,
+            "mean_level": float(np.mean([r["level_at_depth"][depth - 1] for r in reached])),
+            "mean_xp": float(np.mean([r["xp_at_depth"][depth - 1] for r in reached])),
+        })
+    return {
+        "games": count,
+        "died": sum(1 for r in results if r["died"]) / count,
+        "mean_depth": float(np.mean([r["depth"] for r in results])),
+        "mean_turns": float(np.mean([r["turns"] for r in results])),
+        "mean_damage_dealt": float(np.mean([r["damage_dealt"] for r in results])),
+        "mean_damage_taken": float(np.mean([r["damage_taken"] for r in results])),
+        "mean_kills": float(np.mean([r["kills"] for r in results])),
+        "depths": depths,
+    }
+
+def print_summary(summary):
+    """Print a summary as text tables."""
+    print(f"games {summary['games']}  died {summary['died']:.1%}  mean depth {summary['mean_depth']:.2f}"
+          f"  mean turns {summary['mean_turns']:.0f}  kills {summary['mean_kills']:.1f}")
+    print(f"damage dealt {summary['mean_damage_dealt']:.1f}  taken {summary['mean_damage_taken']:.1f}")
+    print(f"{'depth':>5} {'reached':>8} {'died':>6} {'turns':>8} {'level':>6} {'xp':>8}")
+    for row in summary["depths"]:
+        turns = f"{row['mean_turns']:.1f}" if row["mean_turns"] is not None else "-"
+        print(f"{row['depth']:>5} {row['reached']:>8.1%} {row['died_here']:>6} {turns:>8}"
+              f" {row['mean_level']:>6.2f} {row['mean_xp']:>8.1f}")
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=1000, help="number of games to play")
+    parser.add_argument('--seed', type=int, default=1, help="master seed")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS, help="turn limit per game")
+    parser.add_argument('--max-depth', type=int, default=MAX_DEPTH, help="stop games reaching this depth")
+    parser.add_argument('--generator', default=DEFAULT_GENERATOR, choices=sorted(GENERATORS),
+                        help="map generator")
+    parser.add_argument('--output', help="write the summary and per-game results as JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run(args.games, args.seed, args.workers, args.max_turns, args.max_depth, args.generator)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    print_summary(summary)
+    print(f"{args.games} games in {elapsed:.1f} s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"seed": args.seed, "generator": args.generator, "summary": summary, "games": results}, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,28 +1,153 @@
 # sound.py
 """Sound effects and music management."""
 
+from collections import namedtuple
+import threading
+import time
 import pygame
 from constants import *
 
+# A sound effect: its file, the channel category it plays on, its priority
+# when channels run out (higher steals lower) and the minimum time in
+# seconds between two plays of it.
+SoundSpec = namedtuple('SoundSpec', 'path category priority min_interval')
+
+SOUNDS = {
+    'move': SoundSpec('move.wav', 'movement', 0, 0.08),
+    'attack': SoundSpec('attack.wav', 'combat', 2, 0.0),
+    'button_click': SoundSpec('button_click.wav', 'ui', 1, 0.0),
+}
+
+# Channels reserved for each category, so spammy sounds cannot starve others.
+CHANNELS = {'movement': 1, 'combat': 3, 'ui': 1}
+
+MUSIC_FILE = 'songs/journeys_dawn.mid'
+
+class ChannelPool:
+    """
+    A fixed group of mixer channels for one sound category.
+
+    When every channel is busy a new sound takes over the channel playing the
+    lowest priority sound (the oldest one among equals), as long as that
+    priority is not higher than its own; otherwise it is dropped.
+    """
+    def __init__(self, channels):
+        self.channels = channels
+        self.playing = [(0, 0.0)] * len(channels)
+
+    def play(self, sound, priority, now):
+        """
+        Play a sound on a free or stolen channel.
+
+        Returns:
+            bool: Whether the sound was played.
+        """
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                victim = i
+                break
+            if victim is None or self.playing[i] < self.playing[victim]:
+                victim = i
+        if victim is None:
+            return False
+        if self.channels[victim].get_busy() and self.playing[victim][0] > priority:
+            return False
+        self.channels[victim].play(sound)
+        self.playing[victim] = (priority, now)
+        return True
+
 class SoundManager:
-    """Manages game audio."""
-    def __init__(self):
-        pygame.mixer.init()
+    """
+    Manages game audio.
+
+    The mixer, sound effects and music are loaded on a background thread so
+    startup never waits on audio; sounds played before they are ready are
+    skipped. Callbacks registered with ``when_ready`` run once loading is
+    done, on the loading thread. Each category in CHANNELS gets its own pool
+    of reserved channels, and sounds with a ``min_interval`` are rate
+    limited.
+    """
+    def __init__(self, background=True):
         self.sounds = {}
+        self.pools = {}
+        self.last_played = {}
+        self.ready = False
+        self.callbacks = []
+        self.lock = threading.Lock()
+        if background:
+            self.loader = threading.Thread(target=self.load, name='sound-loader', daemon=True)
+            self.loader.start()
+        else:
+            self.loader = None
+            self.load()
+
+    def load(self):
+        """Initialize the mixer and load sound effects and music."""
         try:
-            # Load sound effects
-            self.sounds['move'] = pygame.mixer.Sound('move.wav')
-            self.sounds['attack'] = pygame.mixer.Sound('attack.wav')
-            self.sounds['button_click'] = pygame.mixer.Sound('button_click.wav')
-            # Load title screen music
-            pygame.mixer.music.load('songs/journeys_dawn.mid')
-            pygame.mixer.music.play(-1)  # Loop indefinitely
-        except FileNotFoundError:
-            print("Warning: Sound files not found. Audio will be disabled.")
+            pygame.mixer.init()
+            self.reserve_channels()
         except pygame.error as e:
-            print(f"Error loading audio: {e}")
+            print(f"Error initializing audio: {e}")
+        else:
+            sounds = {}
+            for name, spec in SOUNDS.items():
+                try:
+                    sounds[name] = pygame.mixer.Sound(spec.path)
+                except FileNotFoundError:
+                    print(f"Warning: Sound file {spec.path} not found.")
+                except pygame.error as e:
+                    print(f"Warning: Could not load sound file {spec.path}: {e}")
+            self.sounds = sounds
+            try:
+                # Load title screen music
+                pygame.mixer.music.load(MUSIC_FILE)
+                pygame.mixer.music.play(-1)  # Loop indefinitely
+            except (FileNotFoundError, pygame.error) as e:
+                print(f"Error loading music: {e}")
+        with self.lock:
+            self.ready = True
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def reserve_channels(self):
+        """Set aside a pool of mixer channels for each sound category."""
+        total = sum(CHANNELS.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)
+        start = 0
+        for category, count in CHANNELS.items():
+            self.pools[category] = ChannelPool([pygame.mixer.Channel(i) for i in range(start, start + count)])
+            start += count
+
+    def when_ready(self, callback):
+        """Call ``callback(sound_manager)`` once loading is done (at once if it already is)."""
+        with self.lock:
+            if not self.ready:
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+    def notify(self, game, event):
+        """Play the sound effect named after a game event, if there is one."""
+        self.play(event)
 
     def play(self, sound_name):
-        """Play a sound effect if it exists."""
-        if sound_name in self.sounds:
-            self.sounds[sound_name].play()
\ No newline at end of file
+        """
+        Play a sound effect if it is loaded and not rate limited.
+
+        Returns:
+            bool: Whether the sound was played.
+        """
+        sound = self.sounds.get(sound_name)
+        if sound is None:
+            return False
+        spec = SOUNDS[sound_name]
+        now = time.monotonic()
+        if now - self.last_played.get(sound_name, float('-inf')) < spec.min_interval:
+            return False
+        if not self.pools[spec.category].play(sound, spec.priority, now):
+            return False
+        self.last_played[sound_name] = now
+        return True
@@ -0,0 +1,109 @@
+# spatial.py
+"""Spatial hash index for entities on a map."""
+
+import numpy as np
+
+class SpatialIndex:
+    """
+    Buckets entities by the cell they stand on.
+
+    ``cells`` maps (x, y) to the list of entities in that cell and ``counts``
+    is a (height, width) occupancy grid, so point lookups are O(1) and mask
+    or rectangle queries cost no more than the number of occupied cells.
+    The index does not watch entities: call ``relocate`` after an entity
+    moves.
+    """
+    def __init__(self, width, height, entities=()):
+        self.width = width
+        self.height = height
+        self.cells = {}
+        self.counts = np.zeros((height, width), dtype=np.int32)
+        self.size = 0
+        for entity in entities:
+            self.add(entity)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, entity):
+        """Insert an entity at its current position."""
+        self.cells.setdefault((entity.x, entity.y), []).append(entity)
+        self.counts[entity.y, entity.x] += 1
+        self.size += 1
+
+    def remove(self, entity, x=None, y=None):
+        """Remove an entity, optionally from a position other than its current one."""
+        x = entity.x if x is None else x
+        y = entity.y if y is None else y
+        bucket = self.cells[(x, y)]
+        bucket.remove(entity)
+        if not bucket:
+            del self.cells[(x, y)]
+        self.counts[y, x] -= 1
+        self.size -= 1
+
+    def relocate(self, entity, old_x, old_y):
+        """Move an entity's entry from (old_x, old_y) to its current position."""
+        if (old_x, old_y) != (entity.x, entity.y):
+            self.remove(entity, old_x, old_y)
+            self.add(entity)
+
+    def at(self, x, y):
+        """Return the entities at (x, y) as a new list."""
+        return list(self.cells.get((x, y), ()))
+
+    def first_at(self, x, y):
+        """Return one entity at (x, y), or None."""
+        bucket = self.cells.get((x, y))
+        return bucket[0] if bucket else None
+
+    def in_mask(self, mask, left=0, top=0):
+        """
+        Return the entities standing on cells set in a bool mask.
+
+        Args:
+            mask (numpy.ndarray): Bool mask of a map area, such as a
+                Visibility window; the whole map by default.
+            left (int): X-coordinate of the mask's top-left cell.
+            top (int): Y-coordinate of the mask's top-left cell.
+
+        Returns:
+            list: Matching entities in row-major cell order.
+        """
+        height, width = mask.shape
+        cells = self._occupied(*self._clip((left, top, width, height)))
+        return self._collect([(x, y) for x, y in cells if mask[y - top, x - left]])
+
+    def in_rect(self, x, y, w, h):
+        """Return the entities inside a rectangle, clipped to the map."""
+        return self._collect(self._occupied(*self._clip((x, y, w, h))))
+
+    def _occupied(self, left, top, right, bottom):
+        """
+        Return the occupied (x, y) cells of an area in row-major order.
+
+        Walks whichever is smaller, the occupied cells or the area, so the
+        cost never grows with the size of the map.
+        """
+        if left >= right or top >= bottom:
+            return []
+        if len(self.cells) < (right - left) * (bottom - top):
+            cells = [(x, y) for x, y in self.cells if left <= x < right and top <= y < bottom]
+            cells.sort(key=lambda cell: (cell[1], cell[0]))
+            return cells
+        ys, xs = np.nonzero(self.counts[top:bottom, left:right])
+        return list(zip((xs + left).tolist(), (ys + top).tolist()))
+
+    def _clip(self, rect):
+        """Clip an (x, y, w, h) rectangle, or the whole map if None, to bounds."""
+        if rect is None:
+            return 0, 0, self.width, self.height
+        x, y, w, h = rect
+        return max(x, 0), max(y, 0), min(x + w, self.width), min(y + h, self.height)
+
+    def _collect(self, cells):
+        """Concatenate the buckets of the given cells."""
+        result = []
+        for cell in cells:
+            result.extend(self.cells[cell])
+        return result
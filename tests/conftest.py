@@ -0,0 +1,50 @@
+# conftest.py
+"""
+Test setup and shared fixtures.
+
+The game's top-level modules are made importable and pygame runs without a
+display or sound card.
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Game modules can only be imported once the repo root is on sys.path.
+import pygame
+from game import Game
+from map import Map
+from constants import *
+
+@pytest.fixture
+def map_from_rows():
+    """Return a builder of maps from strings, '#' for wall and '.' for floor."""
+    def build(rows):
+        return Map.from_tiles(np.array([[TILE_WALL if c == '#' else TILE_FLOOR for c in row] for row in rows]))
+    return build
+
+@pytest.fixture
+def open_map():
+    """Return a builder of all-floor maps of a given size, walled in at the edges."""
+    def build(width, height):
+        game_map = Map(width, height, generate=False)
+        game_map.fill_rect(1, 1, width - 2, height - 2, TILE_FLOOR)
+        return game_map
+    return build
+
+@pytest.fixture
+def screen():
+    """An off-screen surface the size of the game window, with fonts ready for the UI."""
+    pygame.font.init()
+    return pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+@pytest.fixture
+def game():
+    """A headless game on a fixed seed."""
+    return Game(headless=True, seed=4)
@@ -0,0 +1,29 @@
+"""Tests for the sprite atlas and drawing entities from it."""
+
+from atlas import SpriteAtlas
+from constants import *
+
+def test_growing_keeps_packed_sprites():
+    atlas = SpriteAtlas(tile_size=4, columns=2)
+    first = atlas.add_color('red', (255, 0, 0))
+    atlas.add_color('green', (0, 255, 0))
+    third = atlas.add_color('blue', (0, 0, 255))
+    assert atlas.surface.get_size() == (8, 8)
+    assert third.topleft == (0, 4)
+    assert atlas.surface.get_at(first.topleft)[:3] == (255, 0, 0)
+    assert atlas.get('green') is not None and atlas.get('missing') is None
+
+def test_entity_drawn_when_its_sprite_grows_the_atlas(game, screen):
+    game.draw(screen)
+    atlas = game.view.atlas
+    while len(atlas.rects) % atlas.columns:
+        atlas.add_color(('filler', len(atlas.rects)), COLOR_BLACK)
+    height = atlas.surface.get_height()
+    player = game.player
+    player.color = (12, 34, 56)
+    game.emit('turn')
+    game.draw(screen)
+    assert atlas.surface.get_height() > height
+    left, top = game.view.camera.offset
+    size = game.view.camera.tile_size
+    assert screen.get_at((player.x * size + left, player.y * size + top))[:3] == (12, 34, 56)
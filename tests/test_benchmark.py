@@ -0,0 +1,17 @@
+"""Tests for the benchmark suite's helpers."""
+
+from benchmark import bench_process_action, bench_draw, compare, scripted_moves, summarize
+
+def test_scripted_moves_are_reproducible():
+    assert scripted_moves(50) == scripted_moves(50)
+
+def test_cases_return_one_sample_per_call():
+    assert len(bench_process_action(10)) == 10
+    assert len(bench_draw(3, idle=True)) == 3
+
+def test_summary_and_regressions():
+    stats = summarize([1000, 2000, 3000, 4000])
+    assert stats["samples"] == 4 and stats["min_us"] == 1.0 and stats["median_us"] == 3.0
+    baseline = {"fast": {"median_us": 10.0}, "slow": {"median_us": 10.0}}
+    results = {"fast": {"median_us": 10.5}, "slow": {"median_us": 12.0}, "new": {"median_us": 1.0}}
+    assert compare(results, baseline, 0.10) == ["slow"]
@@ -0,0 +1,43 @@
+"""Tests for the scrolling camera and windowed visibility."""
+
+import numpy as np
+from camera import Camera
+from fov import Visibility
+from game import Game
+from constants import *
+
+def test_camera_scrolls_only_near_the_edge():
+    camera = Camera(20, 10, margin=4)
+    assert camera.follow(50, 50, 200, 100) == (40, 45)
+    assert camera.follow(55, 50, 200, 100) == (0, 0)
+    assert camera.follow(56, 50, 200, 100) == (6, 0)
+    assert (camera.x, camera.y) == (46, 45)
+    assert camera.contains(56, 50) and not camera.contains(66, 50)
+
+def test_camera_stays_inside_the_map():
+    camera = Camera(20, 10, margin=4)
+    camera.follow(1, 1, 200, 100)
+    assert (camera.x, camera.y) == (0, 0)
+    camera.follow(199, 99, 200, 100)
+    assert (camera.x, camera.y) == (180, 90)
+    camera.follow(5, 5, 12, 8)
+    assert (camera.x, camera.y) == (0, 0)
+
+def test_visibility_queries_outside_the_window():
+    window = np.array([[True, False], [True, True]])
+    visible = Visibility(window, 10, 20)
+    assert visible.rect == (10, 20, 2, 2)
+    assert visible.is_visible(10, 21) and not visible.is_visible(11, 20)
+    assert not visible.is_visible(0, 0) and not visible.is_visible(12, 21)
+    assert visible.crop(9, 19, 12, 22).tolist() == [[False, False, False],
+                                                    [False, True, False],
+                                                    [False, True, True]]
+
+def test_turns_keep_visibility_window_sized_on_large_maps():
+    game = Game(headless=True, seed=2, width=400, height=300)
+    for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)] * 3:
+        game.process_action(dx, dy)
+    size = 2 * FOV_RADIUS + 1
+    assert game.visible.window.shape[0] <= size and game.visible.window.shape[1] <= size
+    assert game.visible.is_visible(game.player.x, game.player.y)
+    assert game.map.explored[game.player.y, game.player.x]
@@ -0,0 +1,51 @@
+"""Tests for the struct-of-arrays entity store."""
+
+import numpy as np
+from components import EntityStore, KIND_FREE, KIND_MONSTER, apply_damage, chebyshev_distance, move_by
+from entity import SHARED_STORE
+from game import Game
+from item import create_health_potion
+from monster import Monster
+
+def test_components_live_in_parallel_arrays():
+    store = EntityStore(capacity=2)
+    monsters = [Monster(i, 2 * i, store=store) for i in range(5)]
+    assert store.capacity == 8 and store.size == 5
+    assert store.x[:5].tolist() == [0, 1, 2, 3, 4] and store.y[:5].tolist() == [0, 2, 4, 6, 8]
+    assert store.slots(KIND_MONSTER).tolist() == [0, 1, 2, 3, 4]
+    monsters[3].health = 7
+    assert store.health[3] == 7 and store.entities[3] is monsters[3]
+
+def test_released_slots_are_cleared_and_reused():
+    store = EntityStore()
+    first, second = Monster(4, 5, store=store), Monster(6, 7, store=store)
+    first.release()
+    assert store.kind[0] == KIND_FREE and store.entities[0] is None
+    assert all(getattr(store, name)[0] == 0 for name in ('x', 'y', 'health', 'strength', 'xp_value', 'speed'))
+    third = Monster(1, 1, store=store)
+    assert third.slot == 0 and store.size == 2 and second.x == 6
+
+def test_bulk_systems():
+    store = EntityStore()
+    monsters = [Monster(x, 0, health=10, store=store) for x in (1, 5, 9)]
+    slots = np.array([m.slot for m in monsters])
+    move_by(store, slots, np.array([1, 0, -1]), np.array([0, 2, 0]))
+    assert [(m.x, m.y) for m in monsters] == [(2, 0), (5, 2), (8, 0)]
+    assert chebyshev_distance(store, slots, 5, 0).tolist() == [3, 2, 3]
+    assert apply_damage(store, slots, np.array([3, 10, 12])).tolist() == [1, 2]
+
+def test_player_and_carried_items_share_one_store():
+    game = Game(headless=True, seed=8)
+    item = game.items[0]
+    item.detach(game.player_store)
+    game.player.inventory.append(item)
+    assert game.player.store is game.player_store and item.store is game.player_store
+    assert game.player_store.size == 2
+    game.player.use_item(0)
+    assert game.player_store.kind[item.slot] == KIND_FREE
+
+def test_entities_without_a_store_share_one():
+    first, second = create_health_potion(1, 1), create_health_potion(2, 2)
+    assert first.store is SHARED_STORE and second.store is SHARED_STORE
+    first.release()
+    second.release()
@@ -0,0 +1,96 @@
+"""Tests for the iterative shadowcasting FOV engine and its cache."""
+
+import random
+import numpy as np
+from fov import OCTANTS, compute_fov, compute_fov_window, FovCache
+from map import Map, Room
+from constants import *
+
+def reference_fov(transparent, x, y, radius):
+    """Plain recursive shadowcasting, the algorithm the table-driven engine replaces."""
+    height, width = transparent.shape
+    visible = np.zeros((height, width), dtype=bool)
+    visible[y, x] = True
+
+    def cast(row, start, end, xx, xy, yx, yy):
+        if start < end:
+            return
+        new_start = start
+        for j in range(row, radius + 1):
+            blocked = False
+            for dx in range(-j, 1):
+                dy = -j
+                l_slope, r_slope = (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5)
+                if start < r_slope:
+                    continue
+                if end > l_slope:
+                    break
+                map_x, map_y = x + dx * xx + dy * xy, y + dx * yx + dy * yy
+                inside = 0 <= map_x < width and 0 <= map_y < height
+                clear = inside and transparent[map_y, map_x]
+                if inside and dx * dx + dy * dy <= radius * radius:
+                    visible[map_y, map_x] = True
+                if blocked:
+                    if not clear:
+                        new_start = r_slope
+                        continue
+                    blocked = False
+                    start = new_start
+                elif not clear and j < radius:
+                    blocked = True
+                    cast(j + 1, start, l_slope, xx, xy, yx, yy)
+                    new_start = r_slope
+            if blocked:
+                break
+
+    for octant in OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return visible
+
+def test_matches_recursive_shadowcasting():
+    rng = random.Random(7)
+    for _ in range(20):
+        transparent = np.array([[rng.random() > 0.3 for _ in range(30)] for _ in range(20)])
+        x, y = rng.randrange(30), rng.randrange(20)
+        for radius in (3, FOV_RADIUS):
+            expected = reference_fov(transparent, x, y, radius)
+            assert np.array_equal(compute_fov(transparent, x, y, radius), expected)
+
+def test_window_is_clipped_to_the_map():
+    transparent = np.ones((10, 10), dtype=bool)
+    window, left, top = compute_fov_window(transparent, 1, 2, 4)
+    assert (left, top) == (0, 0)
+    assert window.shape == (7, 6)
+    assert window[2, 1]
+
+def test_walls_block_sight():
+    transparent = np.ones((5, 9), dtype=bool)
+    transparent[:, 4] = False
+    visible = compute_fov(transparent, 1, 2, 8)
+    assert visible[2, 4] and not visible[:, 5:].any()
+
+def test_cache_hits_until_the_map_changes():
+    game_map = Map(12, 12, generate=False)
+    game_map.fill_rect(1, 1, 10, 10, TILE_FLOOR)
+    cache = FovCache()
+    first = cache.get(game_map, 3, 3, 6)
+    assert np.array_equal(cache.get(game_map, 3, 3, 6), first)
+    assert (cache.hits, cache.misses) == (1, 1)
+    game_map.set_tile(4, 3, TILE_WALL)
+    assert not cache.get(game_map, 3, 3, 6)[3, 5]
+    assert cache.misses == 2
+
+class DirectWriteGenerator:
+    """Generator that carves by writing ``tiles`` directly, without the setters."""
+    def generate(self, game_map):
+        game_map.tiles[1:-1, 1:-1] = TILE_FLOOR
+        game_map.rooms = [Room(1, 1, 4, 4), Room(6, 6, 4, 4)]
+
+def test_generated_maps_get_a_fresh_version():
+    cache = FovCache()
+    blank = Map(12, 12, generate=False)
+    version = blank.version
+    game_map = Map(12, 12, generator=DirectWriteGenerator())
+    assert game_map.version > version
+    assert game_map.is_walkable(5, 5)
+    assert cache.get(game_map, 5, 5, 4)[5, 8]
@@ -0,0 +1,81 @@
+"""Tests for the headless game's turn logic."""
+
+from game import Game
+from monster import Monster
+from spatial import SpatialIndex
+from constants import *
+
+def set_level(game, game_map, player, monsters):
+    """Put a game on a hand-made map with monsters at the given positions."""
+    game.map = game_map
+    game.player.x, game.player.y = player
+    store = game.entity_store
+    for monster in game.monsters:
+        monster.release()
+    game.monsters = [Monster(x, y, store=store) for x, y in monsters]
+    game.items = []
+    game.monster_index = SpatialIndex(game.map.width, game.map.height, game.monsters)
+    game.item_index = SpatialIndex(game.map.width, game.map.height)
+    game.scheduler.clear()
+    game.update_fov()
+    return game.monsters
+
+JUNCTION = [
+    "#######",
+    "#####.#",
+    "#.....#",
+    "#####.#",
+    "#######",
+]
+
+def test_monsters_never_share_a_cell(map_from_rows):
+    game = Game(headless=True, seed=1)
+    upper, lower = set_level(game, map_from_rows(JUNCTION), (1, 2), [(5, 1), (5, 3)])
+    game.act_monsters([upper, lower])
+    positions = {(upper.x, upper.y), (lower.x, lower.y)}
+    assert len(positions) == 2
+    assert (4, 2) in positions
+    assert {(m.x, m.y) for m in game.monster_index.in_rect(0, 0, 7, 5)} == positions
+
+def test_monsters_in_a_corridor_advance_in_line(map_from_rows):
+    game = Game(headless=True, seed=1)
+    first, second = set_level(game, map_from_rows(JUNCTION), (1, 2), [(4, 2), (5, 2)])
+    game.act_monsters([second, first])
+    assert [(first.x, first.y), (second.x, second.y)] == [(3, 2), (4, 2)]
+
+def test_travel_to_stairs_stops_on_arrival_at_the_next_level(map_from_rows):
+    game = Game(headless=True, seed=1)
+    set_level(game, map_from_rows([
+        "#########",
+        "#.......#",
+        "#########",
+    ]), (1, 1), [])
+    game.map.set_tile(7, 1, TILE_STAIRS_DOWN)
+    game.map.explored[:] = True
+    assert game.travel_to_stairs() == 6
+    assert game.current_level == 2
+
+def test_travel_stops_when_a_monster_is_in_view(map_from_rows):
+    game = Game(headless=True, seed=1)
+    set_level(game, map_from_rows(JUNCTION), (1, 2), [(5, 1)])
+    assert game.travel_to((5, 2)) == 0
+
+class EventLog:
+    """Observer that records the events it is notified of."""
+    def __init__(self):
+        self.events = []
+
+    def notify(self, game, event):
+        self.events.append(event)
+
+def test_headless_games_run_without_display_or_audio():
+    import pygame
+    game = Game(headless=True, seed=5)
+    assert game.observers == [] and game.view is None
+    log = EventLog()
+    game.attach(log)
+    for _ in range(20):
+        game.process_action(1, 0)
+        game.process_action(0, 1)
+    assert 'turn' in log.events
+    assert not pygame.display.get_init() or pygame.display.get_surface() is None
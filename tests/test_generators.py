@@ -0,0 +1,44 @@
+"""Tests for the pluggable dungeon generators."""
+
+import random
+import numpy as np
+import pytest
+from generators import GENERATORS, ROOM_SIZE, anchor_rooms, get_generator
+from map import Map
+from pathfinding import FlowField, UNREACHABLE
+from constants import *
+
+@pytest.mark.parametrize('name', sorted(GENERATORS))
+def test_rooms_and_stairs_are_connected(name):
+    for seed in range(5):
+        game_map = Map(MAP_WIDTH, MAP_HEIGHT, random.Random(seed), generator=get_generator(name))
+        assert game_map.rooms
+        assert np.array_equal(game_map.walkable, np.isin(game_map.tiles, (TILE_FLOOR, TILE_STAIRS_DOWN, TILE_STAIRS_UP)))
+        ys, xs = np.nonzero(game_map.tiles == TILE_STAIRS_DOWN)
+        assert len(xs) == 1
+        field = FlowField(game_map, int(xs[0]), int(ys[0]), MAP_WIDTH * MAP_HEIGHT)
+        for room in game_map.rooms:
+            assert field.distance(*room.center()) != UNREACHABLE, (name, seed, room.center())
+        for y, x in np.argwhere(game_map.tiles == TILE_STAIRS_UP).tolist():
+            assert field.distance(x, y) != UNREACHABLE
+
+@pytest.mark.parametrize('name', sorted(GENERATORS))
+def test_layouts_are_reproducible(name):
+    first = Map(60, 40, random.Random(9), generator=get_generator(name))
+    second = Map(60, 40, random.Random(9), generator=get_generator(name))
+    assert np.array_equal(first.tiles, second.tiles)
+
+def test_unknown_generator_is_rejected():
+    with pytest.raises(ValueError):
+        get_generator('maze')
+
+def test_anchor_rooms_start_on_existing_floor():
+    tiles = np.full((30, 40), TILE_WALL, dtype=np.uint8)
+    tiles[5:25, 10:30] = TILE_FLOOR
+    before = tiles.copy()
+    rooms = anchor_rooms(tiles, random.Random(4), 6)
+    assert len(rooms) == 6
+    for room in rooms:
+        assert before[room.y, room.x] == TILE_FLOOR
+        assert (room.w, room.h) == (ROOM_SIZE, ROOM_SIZE)
+        assert (tiles[room.y:room.y + room.h, room.x:room.x + room.w] == TILE_FLOOR).all()
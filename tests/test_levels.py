@@ -0,0 +1,53 @@
+"""Tests for seeded level generation and the level store."""
+
+import numpy as np
+from game import Game
+from levels import generate_level, LevelGenerator, LevelSnapshot, LevelStore, Level
+
+def layout(level):
+    """Return a level's tiles and entity positions for comparison."""
+    return (level.map.tiles.tobytes(), [(m.x, m.y, m.health) for m in level.monsters],
+            [(i.x, i.y, i.name) for i in level.items])
+
+def test_levels_are_reproducible_from_the_seed():
+    assert layout(generate_level(42, 3)) == layout(generate_level(42, 3))
+    assert layout(generate_level(42, 3)) != layout(generate_level(42, 4))
+    assert layout(generate_level(42, 3)) != layout(generate_level(43, 3))
+
+def test_prefetched_levels_match_generated_ones():
+    levels = LevelGenerator(42, background=True)
+    try:
+        levels.prefetch([2, 3])
+        assert layout(levels.take(3)) == layout(generate_level(42, 3))
+        assert layout(levels.take(2)) == layout(generate_level(42, 2))
+        assert levels.pending == {}
+    finally:
+        levels.shutdown()
+
+def test_snapshots_restore_the_level_as_left():
+    level = generate_level(42, 2)
+    level.monsters[0].health = 3
+    level.map.explored[2:5, 2:5] = True
+    snapshot = LevelSnapshot.capture(2, level.map, level.monsters, level.items)
+    restored = LevelSnapshot.from_bytes(snapshot.to_bytes()).restore()
+    assert layout(restored) == layout(level)
+    assert np.array_equal(restored.map.explored, level.map.explored)
+    assert [r.center() for r in restored.map.rooms] == [r.center() for r in level.map.rooms]
+
+def test_store_spills_old_levels_to_disk_and_reads_them_back(tmp_path):
+    store = LevelStore(capacity=2, directory=str(tmp_path))
+    levels = {number: generate_level(7, number) for number in (1, 2, 3)}
+    for number, level in levels.items():
+        store.save(number, level.map, level.monsters, level.items)
+    assert store.spilled == {1} and 1 in store
+    assert layout(store.restore(1)) == layout(levels[1])
+    assert store.restore(4) is None
+
+def test_stairs_lead_back_to_the_same_level():
+    game = Game(headless=True, seed=11)
+    game.monsters[0].health = 1
+    before = layout(Level(1, game.map, game.monsters, game.items, game.entity_store))
+    game.change_level(1)
+    game.change_level(-1)
+    after = layout(Level(1, game.map, game.monsters, game.items, game.entity_store))
+    assert after == before
@@ -0,0 +1,47 @@
+"""Tests for incremental dynamic lighting."""
+
+import random
+import numpy as np
+import pytest
+from lighting import Lighting, light_field, LIGHT_SCALE
+from constants import *
+
+@pytest.fixture
+def game_map(open_map):
+    game_map = open_map(40, 30)
+    game_map.fill_rect(20, 1, 1, 20, TILE_WALL)
+    return game_map
+
+def full_recompute(game_map, sources):
+    levels = np.zeros((game_map.height, game_map.width), dtype=np.int32)
+    for source in sources.values():
+        field, left, top = light_field(game_map, *source)
+        levels[top:top + field.shape[0], left:left + field.shape[1]] += field
+    return levels
+
+def test_incremental_updates_match_a_full_recompute(game_map):
+    lighting = Lighting()
+    rng = random.Random(2)
+    for step in range(60):
+        owner = rng.randrange(6)
+        if rng.random() < 0.2:
+            lighting.remove(owner)
+        else:
+            lighting.set(owner, rng.randrange(1, 39), rng.randrange(1, 29), rng.choice((2, 4, 8)), 0.5)
+        if step == 30:
+            game_map.set_tile(10, 10, TILE_WALL)
+        assert np.array_equal(lighting.update(game_map), full_recompute(game_map, lighting.sources))
+
+def test_light_stops_at_walls(game_map):
+    lighting = Lighting()
+    lighting.set('torch', 18, 5, 4, 1.0)
+    levels = lighting.update(game_map)
+    assert levels[5, 18] == LIGHT_SCALE
+    assert levels[5, 19] > 0 and not levels[:, 21:].any()
+
+def test_lighting_keeps_its_own_fov_cache(game, screen):
+    assert game.lighting.fov_cache is not game.fov_cache
+    entries = dict(game.fov_cache.entries)
+    game.draw(screen)
+    assert game.fov_cache.entries == entries
+    assert game.lighting.fov_cache.misses > 0
@@ -0,0 +1,32 @@
+"""Tests for the NumPy-backed Map grids."""
+
+import random
+import numpy as np
+from map import Map, TILE_PROPERTIES, WALKABLE_TILES, TRANSPARENT_TILES
+from constants import *
+
+def test_tile_tables_follow_tile_properties():
+    for tile, (walkable, transparent) in TILE_PROPERTIES.items():
+        assert WALKABLE_TILES[tile] == walkable
+        assert TRANSPARENT_TILES[tile] == transparent
+    assert not WALKABLE_TILES[TILE_WALL] and WALKABLE_TILES[TILE_STAIRS_DOWN]
+
+def test_generated_masks_match_tiles():
+    game_map = Map(MAP_WIDTH, MAP_HEIGHT, random.Random(3))
+    assert game_map.tiles.shape == (MAP_HEIGHT, MAP_WIDTH)
+    assert np.array_equal(game_map.walkable, WALKABLE_TILES[game_map.tiles])
+    assert np.array_equal(game_map.transparent, TRANSPARENT_TILES[game_map.tiles])
+
+def test_setters_keep_masks_in_sync():
+    game_map = Map(10, 8, generate=False)
+    game_map.fill_rect(1, 1, 4, 3, TILE_FLOOR)
+    game_map.set_tile(2, 2, TILE_WALL)
+    assert game_map.is_walkable(1, 1) and not game_map.is_walkable(2, 2)
+    assert not game_map.is_transparent(0, 0)
+    assert np.array_equal(game_map.walkable, WALKABLE_TILES[game_map.tiles])
+
+def test_vectorized_lookups_are_false_out_of_bounds():
+    game_map = Map(10, 8, generate=False)
+    game_map.fill_rect(1, 1, 3, 3, TILE_FLOOR)
+    result = game_map.walkable_at([1, -1, 10, 3], [1, 1, 1, 4])
+    assert result.tolist() == [True, False, False, False]
@@ -0,0 +1,67 @@
+"""Tests for the array-built minimap."""
+
+from types import SimpleNamespace
+import numpy as np
+import pygame
+import pytest
+from entity import Entity
+from minimap import Minimap, MINIMAP_COLORS, UNEXPLORED
+from constants import *
+
+@pytest.fixture
+def game_map(open_map):
+    game_map = open_map(80, 50)
+    game_map.set_tile(10, 10, TILE_STAIRS_DOWN)
+    return game_map
+
+def expected_pixels(game_map):
+    codes = np.where(game_map.explored, game_map.tiles, UNEXPLORED)
+    return MINIMAP_COLORS[codes.T]
+
+def test_incremental_paint_matches_full_repaint(game_map):
+    minimap = Minimap(0, 0)
+    minimap.sync(game_map)
+    assert not minimap.pixels.any()
+    game_map.mark_explored(np.ones((5, 6), dtype=bool), 8, 7)
+    minimap.sync(game_map)
+    game_map.mark_explored(np.ones((3, 3), dtype=bool), 30, 20)
+    minimap.sync(game_map)
+    assert np.array_equal(minimap.pixels, expected_pixels(game_map))
+    game_map.set_tile(9, 9, TILE_WALL)
+    minimap.sync(game_map)
+    assert np.array_equal(minimap.pixels, expected_pixels(game_map))
+
+def test_draw_centres_on_player_and_marks_entities(game_map):
+    game_map.mark_explored(np.ones((50, 80), dtype=bool))
+    player = Entity(70, 45, '@', (1, 2, 3))
+    monster = Entity(60, 40, 'g', (4, 5, 6))
+    game = SimpleNamespace(map=game_map, player=player)
+    screen = pygame.Surface((400, 300))
+    minimap = Minimap(10, 20)
+    rect = minimap.draw(screen, game, [monster, player])
+    assert rect == pygame.Rect(10, 20, MINIMAP_WIDTH * MINIMAP_SCALE, MINIMAP_HEIGHT * MINIMAP_SCALE).inflate(2, 2)
+    left, top = 80 - MINIMAP_WIDTH, 50 - MINIMAP_HEIGHT
+
+    def pixel(x, y):
+        return screen.get_at((10 + (x - left) * MINIMAP_SCALE, 20 + (y - top) * MINIMAP_SCALE))[:3]
+
+    assert pixel(70, 45) == (1, 2, 3)
+    assert pixel(60, 40) == (4, 5, 6)
+    assert pixel(20, 20) == COLOR_GRAY
+    assert pixel(79, 49) == COLOR_DARK_GRAY
+
+def test_game_view_keeps_the_minimap_off_the_playfield(game, screen):
+    game.draw(screen)
+    view = game.view
+    assert view.show_minimap
+    drawn = view.minimap.rect.inflate(2, 2)
+    assert screen.get_rect().contains(drawn)
+    assert not drawn.colliderect(pygame.Rect(0, 0, SCREEN_WIDTH, MAP_SCREEN_HEIGHT))
+    game.message_log.add("A message redraws the UI strip.")
+    assert drawn in game.draw(screen)
+    player, game_map = game.player, game.map
+    width, height = min(MINIMAP_WIDTH, game_map.width), min(MINIMAP_HEIGHT, game_map.height)
+    left = min(max(player.x - width // 2, 0), game_map.width - width)
+    top = min(max(player.y - height // 2, 0), game_map.height - height)
+    x, y = view.minimap.rect.topleft
+    assert screen.get_at((x + (player.x - left) * MINIMAP_SCALE, y + (player.y - top) * MINIMAP_SCALE))[:3] == player.color
@@ -0,0 +1,106 @@
+"""Tests for flow fields and A* paths."""
+
+import numpy as np
+import pytest
+from spatial import SpatialIndex
+from entity import Entity
+from components import EntityStore
+from pathfinding import FlowField, PathFinder, UNREACHABLE, astar
+from constants import *
+
+@pytest.fixture
+def walled(map_from_rows):
+    return map_from_rows([
+        "#########",
+        "#...#...#",
+        "#...#...#",
+        "#.......#",
+        "#########",
+    ])
+
+def test_flow_field_routes_around_walls(walled):
+    field = FlowField(walled, 1, 1, 20)
+    assert field.distance(1, 1) == 0
+    assert field.distance(3, 1) == 2
+    assert field.distance(5, 1) == 5
+    assert field.distance(4, 1) == UNREACHABLE
+    assert field.next_step(5, 1) == (0, 1)
+
+def test_vectorized_steps_match_single_steps(walled):
+    field = FlowField(walled, 1, 1, 20)
+    xs, ys = np.array([7, 5, 2, 1]), np.array([1, 2, 3, 1])
+    dxs, dys = field.next_steps(xs, ys)
+    for x, y, dx, dy in zip(xs.tolist(), ys.tolist(), dxs.tolist(), dys.tolist()):
+        assert (dx, dy) == (field.next_step(x, y) or (0, 0))
+
+def test_next_step_avoids_occupied_cells(walled):
+    field = FlowField(walled, 1, 1, 20)
+    blocker = Entity(4, 3, 'M', COLOR_RED, EntityStore())
+    occupied = SpatialIndex(walled.width, walled.height, [blocker])
+    assert field.next_step(5, 2) == (-1, 1)
+    assert field.next_step(5, 2, occupied) is None
+
+def test_astar_paths_are_shortest(walled):
+    walkable = walled.walkable.tobytes()
+    field = FlowField(walled, 7, 1, 20)
+    for start in [(1, 1), (3, 2), (5, 3), (6, 2)]:
+        path = astar(walkable, walled.width, walled.height, start, (7, 1))
+        assert len(path) == field.distance(*start)
+        steps = [start] + path
+        assert all(max(abs(b[0] - a[0]), abs(b[1] - a[1])) == 1 for a, b in zip(steps, steps[1:]))
+        assert all(walled.is_walkable(x, y) for x, y in path)
+
+def test_astar_rejects_unreachable_and_off_map_points(walled):
+    walkable = walled.walkable.tobytes()
+    assert astar(walkable, walled.width, walled.height, (1, 1), (4, 1)) is None
+    assert astar(walkable, walled.width, walled.height, (1, 1), (20, 1)) is None
+    assert astar(walkable, walled.width, walled.height, (-1, 1), (2, 2)) is None
+
+def test_path_finder_reuses_and_repairs_paths(map_from_rows):
+    game_map = map_from_rows([
+        "##########",
+        "#........#",
+        "#........#",
+        "##########",
+    ])
+    finder = PathFinder()
+    path = finder.find_path(game_map, (1, 1), (8, 1))
+    assert len(path) == 7 and finder.misses == 1
+    assert finder.find_path(game_map, path[2], (8, 1)) == path[3:]
+    assert finder.hits == 1
+    blocked = path[3]
+    game_map.set_tile(*blocked, TILE_WALL)
+    repaired = finder.find_path(game_map, (1, 1), (8, 1))
+    assert finder.repairs == 1 and finder.misses == 1
+    assert blocked not in repaired and repaired[-1] == (8, 1)
+    assert all(game_map.is_walkable(x, y) for x, y in repaired)
+
+def test_path_finder_avoids_tile_types(map_from_rows):
+    game_map = map_from_rows([
+        "#####",
+        "#...#",
+        "#...#",
+        "#####",
+    ])
+    game_map.set_tile(2, 1, TILE_STAIRS_UP)
+    path = PathFinder(avoid=(TILE_STAIRS_UP,)).find_path(game_map, (1, 1), (3, 1))
+    assert path == [(2, 2), (3, 1)]
+
+def test_path_finder_repairs_every_broken_stretch(map_from_rows):
+    game_map = map_from_rows([
+        "############",
+        "#..........#",
+        "#..........#",
+        "#..........#",
+        "############",
+    ])
+    finder = PathFinder()
+    path = finder.find_path(game_map, (1, 2), (10, 2))
+    for blocked in (path[2], path[6]):
+        game_map.set_tile(*blocked, TILE_WALL)
+    repaired = finder.find_path(game_map, (1, 2), (10, 2))
+    assert finder.repairs == 1 and finder.misses == 1
+    assert repaired[-1] == (10, 2)
+    assert all(game_map.is_walkable(x, y) for x, y in repaired)
+    steps = [(1, 2)] + repaired
+    assert all(max(abs(b[0] - a[0]), abs(b[1] - a[1])) == 1 for a, b in zip(steps, steps[1:]))
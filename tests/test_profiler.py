@@ -0,0 +1,40 @@
+"""Tests for the per-phase profiler."""
+
+import time
+from game import Game
+from profiler import Profiler
+
+def test_nested_phases_of_one_name_are_timed_once():
+    profiler = Profiler()
+    with profiler.phase('outer'):
+        with profiler.phase('outer'):
+            time.sleep(0.002)
+        with profiler.phase('inner'):
+            pass
+    assert profiler.calls == {'outer': 1, 'inner': 1}
+    assert profiler.totals['outer'] >= 2_000_000
+    assert profiler.totals['outer'] >= profiler.totals['inner']
+    assert profiler.open_phases == []
+
+def test_turns_and_frames_get_separate_records(screen):
+    game = Game(headless=True, seed=4, profiler=Profiler())
+    game.profiler.reset()
+    game.draw(screen)
+    game.process_action(0, 0)
+    game.draw(screen)
+    frame, turn, second = game.profiler.records
+    assert frame["frame"] == 1 and set(frame["phases_ns"]) == {'draw'}
+    assert turn["turn"] == 1 and 'draw' not in turn["phases_ns"]
+    assert second["frame"] == 2
+
+def test_fov_cells_counts_cells_scanned():
+    game = Game(headless=True, seed=4, profiler=Profiler())
+    game.profiler.reset()
+    game.fov_cache.clear()
+    game.update_fov()
+    counters = game.profiler.current_counts
+    assert counters['fov_cache_misses'] == 1
+    assert counters['fov_cells'] == game.fov_cache.cells_visited
+    assert counters['fov_cells'] >= game.visible.window.sum()
+    game.update_fov()
+    assert counters['fov_cells'] == game.fov_cache.cells_visited
@@ -0,0 +1,47 @@
+"""Tests for the cached, dirty-rect map renderer."""
+
+import numpy as np
+import pygame
+import pytest
+from camera import Camera
+from fov import Visibility
+from renderer import MapRenderer
+from constants import *
+
+@pytest.fixture
+def game_map(open_map):
+    return open_map(20, 12)
+
+def test_unchanged_view_reports_nothing_dirty(game_map):
+    renderer = MapRenderer(Camera(20, 12))
+    visible = np.zeros((12, 20), dtype=bool)
+    assert renderer.refresh(game_map, Visibility(visible, 0, 0), game_map.explored) == [renderer.surface.get_rect()]
+    assert renderer.refresh(game_map, Visibility(visible, 0, 0), game_map.explored) == []
+
+def test_only_changed_tiles_are_repainted(game_map):
+    renderer = MapRenderer(Camera(20, 12))
+    visible = np.zeros((12, 20), dtype=bool)
+    renderer.refresh(game_map, Visibility(visible, 0, 0), game_map.explored)
+    visible[3, 5] = True
+    dirty = renderer.refresh(game_map, Visibility(visible, 0, 0), game_map.explored)
+    assert dirty == [pygame.Rect(5 * TILE_SIZE, 3 * TILE_SIZE, TILE_SIZE, TILE_SIZE)]
+    assert renderer.surface.get_at((5 * TILE_SIZE, 3 * TILE_SIZE))[:3] == COLOR_GRAY
+
+def test_idle_frames_draw_nothing(game, screen):
+    assert screen.get_rect() in game.draw(screen)
+    assert game.draw(screen) == []
+    game.message_log.add("Something happened.")
+    assert game.draw(screen)
+    assert game.draw(screen) == []
+    game.emit('turn')
+    assert game.draw(screen)
+
+def test_partial_redraws_match_a_full_redraw(game, screen):
+    game.draw(screen)
+    for dx, dy in [(1, 0), (0, 1), (1, 1), (-1, 0), (0, -1)] * 4:
+        game.process_action(dx, dy)
+        game.draw(screen)
+    game.view.invalidate()
+    full = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    game.draw(full)
+    assert pygame.image.tobytes(screen, 'RGB') == pygame.image.tobytes(full, 'RGB')
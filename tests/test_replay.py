@@ -0,0 +1,67 @@
+"""Tests for input recording and deterministic replay."""
+
+import random
+import pytest
+from game import Game
+from replay import Replay, ReplayMismatch, OP_USE_ITEM, REPLAY_HEADER, main, record, replay_game, state_checksum
+from constants import *
+
+def recorded_game(turns=300, seed=5, generator=DEFAULT_GENERATOR):
+    """Play random inputs in a recorded game; return the game and its replay."""
+    game = Game(headless=True, seed=seed, width=60, height=40, generator=generator)
+    replay = record(game, checksum_interval=10)
+    rng = random.Random(seed)
+    for turn in range(turns):
+        if game.state == 'dead':
+            break
+        if turn % 40 == 39:
+            game.use_item(0)
+        game.process_action(*rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (0, 0)]))
+    return game, replay
+
+def test_bytes_round_trip():
+    _, replay = recorded_game(60)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert (loaded.seed, loaded.width, loaded.height, loaded.checksum_interval) == (5, 60, 40, 10)
+    assert loaded.inputs == replay.inputs and loaded.checksums == replay.checksums
+    assert len(loaded) == 61 and loaded.inputs[39 * 2] == OP_USE_ITEM
+
+def test_replay_reproduces_the_recorded_game():
+    game, replay = recorded_game()
+    replayed = replay_game(Replay.from_bytes(replay.to_bytes()))
+    assert state_checksum(replayed) == state_checksum(game)
+    assert (replayed.current_level, replayed.time, replayed.state) == (game.current_level, game.time, game.state)
+
+def test_replays_keep_the_map_generator():
+    game, replay = recorded_game(generator='caves')
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert loaded.generator == 'caves'
+    replayed = replay_game(loaded)
+    assert replayed.levels.generator == 'caves'
+    assert state_checksum(replayed) == state_checksum(game)
+    assert (replayed.map.tiles == game.map.tiles).all()
+
+def test_divergence_is_detected():
+    _, replay = recorded_game(60)
+    replay.checksums[2] ^= 1
+    with pytest.raises(ReplayMismatch):
+        replay_game(replay)
+    replay_game(replay, verify=False)
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b'SAVE' + bytes(64))
+
+@pytest.mark.parametrize('cut', [0, 10, REPLAY_HEADER.size + 5, -7, -3, -1])
+def test_truncated_replays_raise_value_error(cut):
+    _, replay = recorded_game(60)
+    data = replay.to_bytes()
+    with pytest.raises(ValueError):
+        Replay.from_bytes(data[:cut])
+
+def test_command_line_reports_unreadable_replays(tmp_path, capsys):
+    _, replay = recorded_game(60)
+    path = tmp_path / 'replay.bin'
+    path.write_bytes(replay.to_bytes()[:-3])
+    assert main([str(path)]) == 1
+    assert "Could not load replay" in capsys.readouterr().out
@@ -0,0 +1,96 @@
+"""Tests for binary save and load."""
+
+import threading
+import pytest
+import savegame
+from game import Game
+from levels import LevelGenerator
+from savegame import encode_game, decode_game, save_game, load_game, SAVE_HEADER
+from item import create_health_potion, create_strength_boost
+from constants import *
+
+def played_game(generator=DEFAULT_GENERATOR):
+    """Return a game a few levels in, with a stored level and some inventory."""
+    game = Game(headless=True, seed=21, generator=generator)
+    game.change_level(1)
+    game.change_level(1)
+    for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)] * 5:
+        game.process_action(dx, dy)
+    game.player.inventory = [create_health_potion(0, 0), create_strength_boost(0, 0)]
+    game.player.xp = 17
+    game.scheduler.schedule(game.monsters[0], game.time + 40)
+    return game
+
+def state(game):
+    player = game.player
+    return (game.seed, game.current_level, game.time, player.x, player.y, player.health, player.xp,
+            [item.name for item in player.inventory], game.map.tiles.tobytes(), game.map.explored.tobytes(),
+            [(m.x, m.y, m.health) for m in game.monsters], [(i.x, i.y, i.name) for i in game.items],
+            sorted(game.level_store.encoded()))
+
+def test_round_trip_restores_the_whole_state():
+    game = played_game()
+    loaded = decode_game(encode_game(game), headless=True)
+    assert state(loaded) == state(game)
+    assert loaded.scheduler.time_of(loaded.monsters[0]) == game.time + 40
+    assert len(loaded.scheduler) == len(game.scheduler)
+
+def test_loads_keep_the_map_generator():
+    game = played_game('caves')
+    loaded = decode_game(encode_game(game), headless=True)
+    assert loaded.levels.generator == 'caves'
+    assert state(loaded) == state(game)
+    game.change_level(1)
+    loaded.change_level(1)
+    assert state(loaded) == state(game)
+
+def test_unknown_generator_raises_value_error():
+    data = bytearray(encode_game(played_game()))
+    offset = SAVE_HEADER.size - 16
+    data[offset:offset + 5] = b'maze\0'
+    with pytest.raises(ValueError, match="corrupt save"):
+        decode_game(bytes(data), headless=True)
+
+def test_loading_generates_no_levels(monkeypatch):
+    data = encode_game(played_game())
+    def fail(self, number):
+        raise AssertionError(f"level {number} generated while loading")
+    monkeypatch.setattr(LevelGenerator, 'take', fail)
+    assert decode_game(data, headless=True).current_level == 3
+
+@pytest.mark.parametrize('cut', [0, 10, SAVE_HEADER.size + 5, 60, 200, -1])
+def test_truncated_saves_raise_value_error(cut):
+    data = encode_game(played_game())
+    with pytest.raises(ValueError):
+        decode_game(data[:cut], headless=True)
+
+def test_unknown_items_raise_value_error():
+    game = played_game()
+    game.player.inventory[0].name = "Mystery Flask"
+    with pytest.raises(ValueError, match="corrupt save"):
+        decode_game(encode_game(game), headless=True)
+
+def test_background_save_reports_its_outcome(tmp_path):
+    game = played_game()
+    results = []
+    save_game(game, str(tmp_path / 'save.dat'), on_done=results.append).join()
+    assert results == [None]
+    assert state(load_game(str(tmp_path / 'save.dat'), headless=True)) == state(game)
+    save_game(game, str(tmp_path / 'missing' / 'save.dat'), on_done=results.append).join()
+    assert isinstance(results[-1], OSError)
+
+def test_levels_are_serialized_and_read_on_the_writer_thread(tmp_path, monkeypatch):
+    game = Game(headless=True, seed=21)
+    game.level_store.capacity = 1
+    for _ in range(3):
+        game.change_level(1)
+    assert game.level_store.spilled
+    threads = []
+    read_source = savegame.read_source
+    def tracking_read_source(source):
+        threads.append(threading.current_thread().name)
+        return read_source(source)
+    monkeypatch.setattr(savegame, 'read_source', tracking_read_source)
+    save_game(game, str(tmp_path / 'save.dat')).join()
+    assert len(threads) == 4 and set(threads) == {'savegame'}
+    assert state(load_game(str(tmp_path / 'save.dat'), headless=True)) == state(game)
@@ -0,0 +1,47 @@
+"""Tests for the energy-based turn scheduler."""
+
+from game import Game
+from scheduler import Scheduler, ACTION_COST, NORMAL_SPEED, action_delay
+
+def test_batches_come_out_in_time_order():
+    scheduler = Scheduler()
+    for name, time in [('c', 300), ('a', 100), ('b', 100), ('d', 250)]:
+        scheduler.schedule(name, time)
+    assert scheduler.pop_batch(1000) == (100, ['a', 'b'])
+    assert scheduler.pop_batch(1000) == (250, ['d'])
+    assert scheduler.pop_batch(200) == (200, [])
+    assert scheduler.pop_batch(300) == (300, ['c'])
+    assert len(scheduler) == 0
+
+def test_rescheduling_and_removal_are_lazy():
+    scheduler = Scheduler()
+    scheduler.schedule('a', 100)
+    scheduler.schedule('b', 100)
+    scheduler.schedule('a', 400)
+    scheduler.remove('b')
+    assert 'a' in scheduler and 'b' not in scheduler
+    assert scheduler.time_of('a') == 400 and scheduler.time_of('b') is None
+    assert scheduler.pop_batch(1000) == (400, ['a'])
+
+def test_faster_actors_act_more_often():
+    assert action_delay(NORMAL_SPEED) == ACTION_COST
+    assert action_delay(2 * NORMAL_SPEED) == ACTION_COST // 2
+    scheduler = Scheduler()
+    scheduler.schedule('slow', 0)
+    scheduler.schedule('fast', 0)
+    acted = []
+    while True:
+        time, actors = scheduler.pop_batch(1000)
+        if not actors:
+            break
+        for actor in actors:
+            acted.append(actor)
+            speed = 2 * NORMAL_SPEED if actor == 'fast' else NORMAL_SPEED
+            scheduler.schedule(actor, time + action_delay(speed))
+    assert acted.count('fast') == 21 and acted.count('slow') == 11
+
+def test_game_time_advances_one_action_per_turn():
+    game = Game(headless=True, seed=3)
+    for _ in range(4):
+        game.process_action(0, 0)
+    assert game.time == 4 * ACTION_COST
@@ -0,0 +1,22 @@
+"""Tests for the headless balance simulator."""
+
+from player import Player
+from simulate import play_game, run, summarize
+
+def test_xp_matches_what_the_player_gained(monkeypatch):
+    gained = []
+    gain_xp = Player.gain_xp
+    def tracking_gain_xp(self, amount):
+        gained.append(amount)
+        gain_xp(self, amount)
+    monkeypatch.setattr(Player, 'gain_xp', tracking_gain_xp)
+    result = play_game(3, max_turns=3000, max_depth=8)
+    assert result["depth"] == 8 and not result["died"]
+    assert result["kills"] == len(gained) > 0
+    assert result["xp_at_depth"][-1] == sum(gained)
+
+def test_results_are_deterministic_per_seed():
+    results = run(3, master_seed=2, workers=1, max_turns=400, max_depth=5)
+    assert results == run(3, master_seed=2, workers=1, max_turns=400, max_depth=5)
+    summary = summarize(results)
+    assert summary["games"] == 3 and summary["depths"][0]["reached"] == 1.0
@@ -0,0 +1,59 @@
+"""Tests for sound channel pools and rate limiting."""
+
+from sound import ChannelPool, SoundManager, SOUNDS
+
+class FakeChannel:
+    """Mixer channel stand-in that remembers what it is playing."""
+    def __init__(self):
+        self.sound = None
+
+    def get_busy(self):
+        return self.sound is not None
+
+    def play(self, sound):
+        self.sound = sound
+
+def test_free_channels_are_used_first():
+    pool = ChannelPool([FakeChannel(), FakeChannel()])
+    assert pool.play('a', 1, 0.0) and pool.play('b', 1, 1.0)
+    assert [channel.sound for channel in pool.channels] == ['a', 'b']
+
+def test_busy_pool_steals_lowest_priority_then_oldest():
+    pool = ChannelPool([FakeChannel(), FakeChannel(), FakeChannel()])
+    pool.play('old', 1, 0.0)
+    pool.play('low', 0, 1.0)
+    pool.play('new', 1, 2.0)
+    assert pool.play('x', 1, 3.0)
+    assert [channel.sound for channel in pool.channels] == ['old', 'x', 'new']
+    assert pool.play('y', 1, 4.0)
+    assert [channel.sound for channel in pool.channels] == ['y', 'x', 'new']
+
+def test_lower_priority_sound_is_dropped_when_busy():
+    pool = ChannelPool([FakeChannel()])
+    pool.play('important', 2, 0.0)
+    assert not pool.play('minor', 1, 1.0)
+    assert pool.channels[0].sound == 'important'
+    pool.channels[0].sound = None
+    assert pool.play('minor', 1, 2.0)
+
+def test_sounds_are_rate_limited():
+    manager = SoundManager(background=False)
+    ready = []
+    manager.when_ready(ready.append)
+    assert ready == [manager]
+    manager.sounds = {'move': 'move', 'attack': 'attack'}
+    manager.pools = {'movement': ChannelPool([FakeChannel()]), 'combat': ChannelPool([FakeChannel()])}
+    assert SOUNDS['move'].min_interval > 0
+    assert manager.play('move')
+    assert not manager.play('move')
+    assert manager.play('attack')
+    assert not manager.play('button_click')
+
+def test_unreadable_sound_files_report_the_error(tmp_path, monkeypatch, capsys):
+    broken = tmp_path / 'broken.wav'
+    broken.write_bytes(b'not a sound')
+    monkeypatch.setitem(SOUNDS, 'move', SOUNDS['move']._replace(path=str(broken)))
+    manager = SoundManager(background=False)
+    out = capsys.readouterr().out
+    assert f"Could not load sound file {broken}:" in out
+    assert 'move' not in manager.sounds
@@ -0,0 +1,36 @@
+"""Tests for the spatial hash index."""
+
+import numpy as np
+from entity import Entity
+from components import EntityStore
+from spatial import SpatialIndex
+
+def make_entities(positions):
+    store = EntityStore()
+    return [Entity(x, y, 'M', (255, 0, 0), store) for x, y in positions]
+
+def test_point_lookup_and_relocate():
+    a, b = make_entities([(2, 3), (2, 3)])
+    index = SpatialIndex(10, 8, [a, b])
+    assert index.at(2, 3) == [a, b] and len(index) == 2
+    a.x = 4
+    index.relocate(a, 2, 3)
+    assert index.first_at(4, 3) is a and index.at(2, 3) == [b]
+    index.remove(b)
+    assert index.first_at(2, 3) is None and len(index) == 1
+
+def test_area_queries_are_row_major():
+    entities = make_entities([(5, 5), (1, 1), (7, 1), (3, 6)])
+    index = SpatialIndex(10, 8, entities)
+    assert index.in_rect(0, 0, 10, 8) == [entities[1], entities[2], entities[0], entities[3]]
+    assert index.in_rect(2, 0, 6, 6) == [entities[2], entities[0]]
+    mask = np.zeros((8, 10), dtype=bool)
+    mask[5:7, 3:6] = True
+    assert index.in_mask(mask) == [entities[0], entities[3]]
+    assert index.in_mask(mask[4:7, 4:7], 4, 4) == [entities[0]]
+
+def test_dense_index_matches_sparse_answers():
+    positions = [(x, y) for y in range(8) for x in range(10) if (x + y) % 3]
+    index = SpatialIndex(10, 8, make_entities(positions))
+    found = [(entity.x, entity.y) for entity in index.in_rect(2, 2, 3, 3)]
+    assert found == [(x, y) for y in range(2, 5) for x in range(2, 5) if (x + y) % 3]
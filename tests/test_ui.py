@@ -0,0 +1,32 @@
+"""Tests for the shared fonts and text cache."""
+
+import pygame
+from ui import TextCache, get_font, MessageLog
+from constants import *
+
+pygame.font.init()
+
+def test_fonts_are_shared():
+    assert get_font(20) is get_font(20)
+
+def test_text_is_rendered_once_per_key():
+    cache = TextCache(maxsize=2)
+    first = cache.render("Hello", 20, COLOR_WHITE)
+    assert cache.render("Hello", 20, COLOR_WHITE) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.render("Hello", 20, COLOR_RED) is not first
+
+def test_least_recently_used_text_is_evicted():
+    cache = TextCache(maxsize=2)
+    cache.render("a", 20, COLOR_WHITE)
+    cache.render("b", 20, COLOR_WHITE)
+    cache.render("a", 20, COLOR_WHITE)
+    cache.render("c", 20, COLOR_WHITE)
+    assert list(cache.surfaces) == [("a", 20, COLOR_WHITE), ("c", 20, COLOR_WHITE)]
+
+def test_message_log_counts_changes():
+    log = MessageLog(0, 0, 100, 40)
+    log.add("one")
+    log.add("two")
+    log.add("three")
+    assert log.messages == ["two", "three"] and log.version == 3
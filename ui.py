@@ -1,9 +1,43 @@
 # ui.py
 """User interface elements."""
 
+from collections import OrderedDict
 import pygame
 from constants import *
 
+_fonts = {}
+
+def get_font(size):
+    """Return the shared default font at a size, loading it on first use."""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, size, color)."""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, size, color):
+        """Return an antialiased surface for text, rendering it on a miss."""
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = get_font(size).render(text, True, color)
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+text_cache = TextCache()
+
 class HealthBar:
     """Displays the player's health."""
     def __init__(self, x, y, width, height):
@@ -17,8 +51,7 @@ class HealthBar:
         ratio = player.health / player.max_health
         pygame.draw.rect(screen, COLOR_RED, (self.x, self.y, self.width, self.height))
         pygame.draw.rect(screen, COLOR_GREEN, (self.x, self.y, int(self.width * ratio), self.height))
-        font = pygame.font.Font(None, 24)
-        text = font.render(f"HP: {player.health}/{player.max_health}", True, COLOR_WHITE)
+        text = text_cache.render(f"HP: {player.health}/{player.max_health}", 24, COLOR_WHITE)
         screen.blit(text, (self.x + self.width + 10, self.y))
 
 class MessageLog:
@@ -30,18 +63,19 @@ class MessageLog:
         self.height = height
         self.messages = []
         self.max_lines = height // 20
+        self.version = 0
 
     def add(self, message):
         """Add a message to the log."""
         self.messages.append(message)
+        self.version += 1
         if len(self.messages) > self.max_lines:
             self.messages.pop(0)
 
     def draw(self, screen):
         """Draw the message log."""
-        font = pygame.font.Font(None, 20)
         for i, msg in enumerate(self.messages):
-            text = font.render(msg, True, COLOR_WHITE)
+            text = text_cache.render(msg, 20, COLOR_WHITE)
             screen.blit(text, (self.x, self.y + i * 20))
 
 class InventoryScreen:
@@ -54,10 +88,9 @@ class InventoryScreen:
 
     def draw(self, screen, player):
         """Draw the inventory screen."""
-        font = pygame.font.Font(None, 24)
         pygame.draw.rect(screen, COLOR_DARK_GRAY, (self.x, self.y, self.width, self.height))
-        title = font.render("Inventory (Press number to use, ESC to close)", True, COLOR_WHITE)
+        title = text_cache.render("Inventory (Press number to use, ESC to close)", 24, COLOR_WHITE)
         screen.blit(title, (self.x + 10, self.y + 10))
         for i, item in enumerate(player.inventory):
-            text = font.render(f"{i + 1}: {item.name}", True, COLOR_WHITE)
+            text = text_cache.render(f"{i + 1}: {item.name}", 24, COLOR_WHITE)
             screen.blit(text, (self.x + 10, self.y + 40 + i * 20))
\ No newline at end of file